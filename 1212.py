@@ -1,253 +1,39 @@
+import time
+
+# відлік для звіту про швидкість запуску — до всіх важких імпортів
+STARTUP_T0 = time.perf_counter()
+
 import os
 import sys
-import json
-import time
+import math
+import wave
+import queue
 import threading
-import subprocess
-import webbrowser
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 
-import requests
 import customtkinter as ctk
 from tkinter import filedialog, messagebox, simpledialog
 import tkinter as tk
-from PIL import Image, ImageOps, ImageDraw, ImageFilter
-import pygame
-import sounddevice as sd
-import numpy as np
-from scipy.io import wavfile
-
-
-APP_NAME = "SchoolBell"
-CONFIG_NAME = "config.json"
-
-
-DEFAULTS = {
-    "photo_path": "",
-
-    "lesson_start_sound_path": "",
-    "lesson_end_sound_path": "",
-    "siren_sound_path": "",
-    "minute_of_silence_sound_path": "",
-
-    "ALERTS_TOKEN": "",
-    "ALERT_UID": 0,
-
-    "minute_of_silence_enabled": True,
-    "candle_gif_path": "",
-
-    "silent_mode": False,
-
-    "test_mode_on": False,
-    "test_offset_seconds": 0,
-
-    "entry_lock_enabled": False,
-    "entry_password": "",
-
-    "shutdown_enabled": False,
-    "shutdown_time": "00:00",
-}
+from PIL import Image, ImageOps
 
+# numpy, sounddevice, pygame, requests і webbrowser імпортуються ліниво:
+# вони не потрібні для першого малювання вікна
+from schoolbell_core import (
+    APP_NAME, CONFIG_WATCH_MS, STARTUP_LOG_NAME, StartupTimer,
+    app_dir, now_local, safe_int, is_hhmm, seconds_to_hhmmss,
+    parse_uid_list, alert_active, find_segment, number_lessons,
+    AudioEngine, BellCore, NameIndex, RecordingLibrary,
+)
 
-DEFAULT_SCHEDULE_12 = [
-    {"n": 1,  "start": "08:00", "end": "08:40"},
-    {"n": 2,  "start": "08:45", "end": "09:25"},
-    {"n": 3,  "start": "09:35", "end": "10:15"},
-    {"n": 4,  "start": "10:20", "end": "11:00"},
-    {"n": 5,  "start": "11:10", "end": "11:50"},
-    {"n": 6,  "start": "12:00", "end": "12:40"},
-    {"n": 7,  "start": "12:45", "end": "13:25"},
-    {"n": 8,  "start": "13:35", "end": "14:15"},
-    {"n": 9,  "start": "14:25", "end": "15:05"},
-    {"n": 10, "start": "15:10", "end": "15:50"},
-    {"n": 11, "start": "15:55", "end": "16:35"},
-    {"n": 12, "start": "16:40", "end": "17:20"},
-]
 
-
-def app_dir() -> Path:
-    p = Path(sys.argv[0]).resolve() if sys.argv and sys.argv[0] else Path.cwd()
-    return p.parent if p.suffix else Path.cwd()
-
-
-def now_local():
-    return datetime.now()
-
-
-def safe_int(x, default=0):
+def make_neon_ring_logo(img: Image.Image, out_size: int = 256) -> Image.Image:
+    """Створює логотип у неоновому кільці"""
+    from PIL import ImageDraw, ImageFilter
     try:
-        return int(x)
-    except Exception:
-        return default
-
-
-def is_hhmm(s: str) -> bool:
-    try:
-        hh, mm = s.split(":")
-        hh = int(hh)
-        mm = int(mm)
-        return 0 <= hh <= 23 and 0 <= mm <= 59
-    except Exception:
-        return False
-
-
-def hhmm_to_seconds(s: str) -> int:
-    hh, mm = s.split(":")
-    return int(hh) * 3600 + int(mm) * 60
-
-
-def seconds_to_hhmmss(total: int) -> str:
-    total = max(0, int(total))
-    mm = total // 60
-    ss = total % 60
-    return f"{mm:02d}:{ss:02d}"
-
-
-class SchoolBellApp(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-
-        ctk.set_appearance_mode("dark")
-        ctk.set_default_color_theme("blue")
-
-        pygame.mixer.init()
-        self._siren_channel = pygame.mixer.Channel(1)
-
-        self.base_dir = app_dir()
-        self.config_path = self.base_dir / CONFIG_NAME
-
-        self.title("Шкільний дзвінок")
-        self.geometry("1200x700")
-        self.minsize(980, 620)
-
-        self.fullscreen = True
-        self.overrideredirect(True)
-        self._go_fullscreen_geometry()
-
-        self.right_mode = "photo"
-        self.settings_open = False
-        self.settings_tab = "main"
-
-        self._alarm_overlay_on = False
-        self._alarm_priority = False
-
-        self._time_offset = timedelta(0)
-        self.test_mode_on = False
-
-        self.photo_path = ""
-        self.photo_img_original = None
-        self._photo_cache_key = None
-        self._photo_cache_img = None
-        self._photo_render_job = None
-
-        self.candle_gif_path = ""
-        self._gif_frames = []
-        self._gif_index = 0
-        self._gif_job = None
-
-        self.minute_of_silence_enabled = True
-        self.minute_of_silence_sound_path = ""
-        self._mos_last_date = None
-        self._mos_active = False
-        self._mos_end_time = None
-
-        self.lesson_start_sound_path = ""
-        self.lesson_end_sound_path = ""
-        self.siren_sound_path = ""
-        self._siren_sound = None
-
-        self.ALERTS_TOKEN = ""
-        self.ALERT_UID = 0
-
-        self.silent_mode = False
-
-        self.entry_lock_enabled = False
-        self.entry_password = ""
-
-        self.shutdown_enabled = False
-        self.shutdown_time = "00:00"
-        self._shutdown_last_date = None
-
-        self.schedule = [dict(x) for x in DEFAULT_SCHEDULE_12]
-        self.lesson_rows = []
-
-        self._load_config()
-
-        if self.entry_lock_enabled:
-            if not self.entry_password:
-                messagebox.showerror("Помилка", "Увімкнено блокування входу, але пароль не задано.")
-            else:
-                if not self._ask_entry_password():
-                    self.destroy()
-                    return
-
-        self._worker_stop = threading.Event()
-        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-
-        # КЛЮЧОВЕ ВИПРАВЛЕННЯ: антидубль дзвінків
-        self._bell_fired_keys = set()
-        self._bell_fired_date = None
-
-        self._build_ui()
-
-        self._update_clock()
-        self.after(1500, self._poll_air_alert)
-
-        self._worker_thread.start()
-        self.protocol("WM_DELETE_WINDOW", self.on_close)
-
-    def _resolve_path(self, path: str) -> str:
-        if not path:
-            return ""
-        try:
-            if os.path.isabs(path):
-                return path
-            return str((self.base_dir / path).resolve())
-        except Exception:
-            return path
-
-    def _basename(self, path: str) -> str:
-        try:
-            return os.path.basename(path) if path else ""
-        except Exception:
-            return ""
-
-    def _go_fullscreen_geometry(self):
-        w = self.winfo_screenwidth()
-        h = self.winfo_screenheight()
-        self.geometry(f"{w}x{h}+0+0")
-
-    def _ask_entry_password(self) -> bool:
-        for _ in range(3):
-            pw = simpledialog.askstring("Пароль", "Введи пароль для входу", show="*")
-            if pw is None:
-                return False
-            if pw.strip() == self.entry_password:
-                return True
-            messagebox.showerror("Помилка", "Невірний пароль.")
-        return False
-
-    def _build_ui(self):
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_columnconfigure(0, weight=1)
-
-        self.topbar = ctk.CTkFrame(self, corner_radius=0, height=44)
-        self.topbar.grid(row=0, column=0, sticky="ew")
-        self.topbar.grid_columnconfigure(0, weight=1)
-
-        self.settings_btn = ctk.CTkButton(self.topbar, text="⚙", width=46, height=30, command=self._toggle_settings_panel)
-        self.settings_btn.grid(row=0, column=0, padx=(10, 0), pady=7, sticky="w")
-
-        right = ctk.CTkFrame(self.topbar, corner_radius=0)
-        right.grid(row=0, column=1, padx=10, pady=7, sticky="e")
-
-        ctk.CTkButton(right, text="—", width=46, height=30, command=self._minimize).pack(side="left", padx=4)
-        ctk.CTkButton(right, text="▢", width=46, height=30, command=self._toggle_fullscreen).pack(side="left", padx=4)
-        ctk.CTkButton(right, text="✕", width=46, height=30, fg_color="#8b2b2b", hover_color="#a43737", command=self.on_close).pack(side="left", padx=4)
-
-        self.btn_pick_siren = ctk.CTkButton(p, text="", command=self._pick_siren_sound)
-        self.btn_pick_siren.grid(row=4, column=0, padx=12, pady=(0, 10), sticky="ew")
         img = img.convert("RGBA")
         base = Image.new("RGBA", (out_size, out_size), (0, 0, 0, 0))
 
@@ -284,44 +70,581 @@ class SchoolBellApp(ctk.CTk):
         return Image.new("RGBA", (out_size, out_size), (0, 0, 0, 0))
 
 
+BG_CACHE_DIR = "cache"
+BG_CACHE_VERSION = 1
+
+
+def _gaussian_kernel(sigma: float):
+    import numpy as np
+    radius = max(1, int(3 * sigma))
+    x = np.arange(-radius, radius + 1, dtype=np.float32)
+    k = np.exp(-(x * x) / (2 * sigma * sigma))
+    return k / k.sum()
+
+
 def make_blue_bg(w: int, h: int) -> Image.Image:
-    """Створює синій фон з градієнтом"""
+    """Створює синій фон з градієнтом.
+
+    Фон змінюється лише по вертикалі, тож рахується один стовпчик кольорів
+    (градієнт + розмите світіння смуги) і розтягується на всю ширину.
+    """
+    import numpy as np
     try:
         w = max(320, int(w))
         h = max(320, int(h))
-        img = Image.new("RGB", (w, h), (6, 12, 22))
-        g = Image.new("L", (1, h))
-        for y in range(h):
-            v = int(30 + 120 * (y / max(1, h - 1)))
-            g.putpixel((0, y), v)
-        grad = g.resize((w, h))
-        blue = Image.new("RGB", (w, h), (10, 90, 170))
-        img = Image.composite(blue, img, grad)
-
-        overlay = Image.new("RGBA", (w, h), (0, 0, 0, 0))
-        d = ImageDraw.Draw(overlay)
-        d.rectangle((0, int(h * 0.40), w, int(h * 0.42)), fill=(90, 220, 255, 70))
-        d.rectangle((0, int(h * 0.40) + 2, w, int(h * 0.40) + 4), fill=(90, 220, 255, 120))
-        overlay = overlay.filter(ImageFilter.GaussianBlur(2))
-        result = Image.alpha_composite(img.convert("RGBA"), overlay)
-        return result.convert("RGBA")
+
+        y = np.arange(h, dtype=np.float32)
+        mask = (30 + 120 * (y / max(1, h - 1))).astype(np.int32).astype(np.float32) / 255.0
+        dark = np.array((6, 12, 22), dtype=np.float32)
+        blue = np.array((10, 90, 170), dtype=np.float32)
+        col = blue * mask[:, None] + dark * (1.0 - mask[:, None])
+
+        # світіння: дві смуги з різною прозорістю, розмиті лише в межах смуги
+        alpha = np.zeros(h, dtype=np.float32)
+        alpha[int(h * 0.40):int(h * 0.42) + 1] = 70 / 255.0
+        alpha[int(h * 0.40) + 2:int(h * 0.40) + 5] = 120 / 255.0
+        # як і PIL, колір шару розмивається разом з прозорим чорним довкола
+        tint = (alpha > 0).astype(np.float32)
+        kernel = _gaussian_kernel(2.0)
+        pad = len(kernel) // 2
+        lo = max(0, int(h * 0.40) - pad)
+        hi = min(h, int(h * 0.42) + 5 + pad)
+        alpha[lo:hi] = np.convolve(alpha[lo:hi], kernel, mode="same")
+        tint[lo:hi] = np.convolve(tint[lo:hi], kernel, mode="same")
+
+        glow = np.array((90, 220, 255), dtype=np.float32) * tint[:, None]
+        col = col * (1.0 - alpha[:, None]) + glow * alpha[:, None]
+
+        rgba = np.empty((h, 4), dtype=np.uint8)
+        rgba[:, :3] = np.clip(col + 0.5, 0, 255).astype(np.uint8)
+        rgba[:, 3] = 255
+        frame = np.ascontiguousarray(np.broadcast_to(rgba[:, None, :], (h, w, 4)))
+        return Image.fromarray(frame, "RGBA")
     except Exception as e:
         print(f"Error creating blue background: {e}")
         return Image.new("RGBA", (max(320, int(w)), max(320, int(h))), (10, 20, 40, 255))
 
 
-class SchoolBellApp(ctk.CTk):
+def load_blue_bg(w: int, h: int, cache_dir: Path) -> Image.Image:
+    """Фон з PNG-кешу на диску; за відсутності рендерить і зберігає"""
+    path = Path(cache_dir) / f"bg_v{BG_CACHE_VERSION}_{int(w)}x{int(h)}.png"
+    try:
+        if path.exists():
+            with Image.open(path) as img:
+                return img.convert("RGBA")
+    except Exception:
+        pass
+    bg = make_blue_bg(w, h)
+    try:
+        path.parent.mkdir(exist_ok=True)
+        bg.save(path, compress_level=1)
+    except Exception:
+        pass
+    return bg
+
+
+# скільки рядків редактора розкладу існує як віджети (решта — лише дані)
+EDITOR_VISIBLE_ROWS = 8
+# скільки рядків списку записів існує як віджети
+RECORDINGS_VISIBLE_ROWS = 10
+
+GIF_DEFAULT_FRAME_MS = 80
+GIF_MIN_FRAME_MS = 20
+
+
+class GifSource:
+    """Ліниве джерело кадрів GIF: кадри декодуються по одному через seek()"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._im = None
+        self._count = None
+        self._durations = {}
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._im is None:
+            self._im = Image.open(self.path)
+            self._count = getattr(self._im, "n_frames", 1)
+        return self._im
+
+    def __len__(self):
+        try:
+            self._open()
+        except Exception:
+            return 0
+        return self._count
+
+    def frame(self, index: int) -> Image.Image:
+        with self._lock:
+            im = self._open()
+            im.seek(index)
+            d = safe_int(im.info.get("duration"), 0)
+            self._durations[index] = max(GIF_MIN_FRAME_MS, d) if d else GIF_DEFAULT_FRAME_MS
+            return im.convert("RGBA")
+
+    def duration(self, index: int) -> int:
+        return self._durations.get(index, GIF_DEFAULT_FRAME_MS)
+
+    def close(self):
+        with self._lock:
+            if self._im is not None:
+                try:
+                    self._im.close()
+                except Exception:
+                    pass
+            self._im = None
+            self._count = None
+            self._durations = {}
+
+
+class ScaledFrameCache:
+    """Кадри анімації, масштабовані під розмір віджета, з фоновою підготовкою наступних"""
+
+    def __init__(self, make_image, budget_bytes: int = 128 * 1024 * 1024, lookahead: int = 12):
+        self._make_image = make_image
+        self.budget_bytes = budget_bytes
+        self.lookahead = lookahead
+        self._source = None
+        self._size = None
+        self._scaled = {}
+        self._pending = set()
+        self._shown = 0
+        self.generation = 0
+
+    def set_source(self, source):
+        if self._source is not None and self._source is not source:
+            self._source.close()
+        self._source = source
+        self.reset()
+
+    def release(self):
+        """Звільняє всі кадри і закриває джерело"""
+        self.set_source(None)
+
+    def reset(self):
+        self._size = None
+        self._scaled = {}
+        self._pending = set()
+        self.generation += 1
+
+    def __len__(self):
+        return len(self._source) if self._source is not None else 0
+
+    def keeps_all(self) -> bool:
+        """Чи вміщаються всі кадри поточного розміру в бюджет пам'яті"""
+        if self._size is None:
+            return False
+        return len(self) * self._size[0] * self._size[1] * 4 <= self.budget_bytes
+
+    def _in_window(self, i: int) -> bool:
+        return self.keeps_all() or (i - self._shown) % len(self) < self.lookahead
+
+    def _fit(self, source, index: int, size: tuple, generation: int = None) -> Image.Image:
+        if source is not self._source or (generation is not None and generation != self.generation):
+            raise RuntimeError("джерело анімації змінилося")
+        frame = source.frame(index)
+        return ImageOps.fit(frame, size, method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
+
+    def get(self, index: int, size: tuple):
+        """(готове зображення, тривалість кадру в мс) для index і size.
+
+        Кадр, який не встиг підготуватися у фоні, масштабується тут же.
+        """
+        if size != self._size:
+            self.reset()
+            self._size = size
+        index %= len(self._source)
+        self._shown = index
+        img = self._scaled.get(index)
+        if img is None:
+            img = self._make_image(self._fit(self._source, index, size))
+            self._scaled[index] = img
+        if not self.keeps_all():
+            for i in [i for i in self._scaled if not self._in_window(i)]:
+                del self._scaled[i]
+        return img, self._source.duration(index)
+
+    def prefetch(self, index: int) -> list:
+        """Завдання (ключ, job) на наступні lookahead кадрів від index, по порядку кадрів"""
+        if self._source is None or self._size is None:
+            return []
+        n = len(self._source)
+        source, size = self._source, self._size
+        jobs = []
+        for step in range(min(self.lookahead, n)):
+            i = (index + step) % n
+            if i in self._scaled or i in self._pending:
+                continue
+            self._pending.add(i)
+            key = ("gif", self.generation, i, size[0], size[1])
+            jobs.append((key, lambda i=i, g=self.generation: self._fit(source, i, size, g)))
+        return jobs
+
+    def put(self, key, fitted):
+        """Кладе кадр, підготовлений у фоні; застарілі (інше джерело чи розмір) відкидає"""
+        _, generation, i, w, h = key
+        if generation != self.generation or (w, h) != self._size:
+            return
+        self._pending.discard(i)
+        if fitted is not None and i not in self._scaled and self._in_window(i):
+            self._scaled[i] = self._make_image(fitted)
+
+
+def load_fitted_image(path: str, size: tuple) -> Image.Image:
+    """Декодує зображення одразу під розмір size (як ImageOps.contain).
+
+    JPEG декодується зі зменшенням у самому декодері (draft), інші
+    формати спершу грубо зменшуються reduce(), і лише потім LANCZOS.
+    """
+    w, h = size
+    with Image.open(path) as im:
+        if im.format == "JPEG":
+            im.draft("RGB", (w, h))
+        img = im.convert("RGBA")
+    ratio = min(w / img.width, h / img.height)
+    target = (max(1, round(img.width * ratio)), max(1, round(img.height * ratio)))
+    return img.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def make_crossfade(prev: Image.Image, nxt: Image.Image, size: tuple, steps: int) -> list:
+    """Проміжні кадри переходу між двома зображеннями, центрованими в size"""
+    def canvas(img):
+        c = Image.new("RGBA", size, (0, 0, 0, 0))
+        c.paste(img, ((size[0] - img.width) // 2, (size[1] - img.height) // 2))
+        return c
+
+    a = canvas(prev)
+    b = canvas(nxt)
+    return [Image.blend(a, b, i / steps) for i in range(1, steps)]
+
+
+def make_wave_thumb(values: list, size: tuple = (120, 28)) -> Image.Image:
+    """Мініатюра хвилі запису: симетричні стовпчики за значеннями 0..100"""
+    from PIL import ImageDraw
+
+    w, h = size
+    img = Image.new("RGBA", size, (0, 0, 0, 0))
+    if not values:
+        return img
+    draw = ImageDraw.Draw(img)
+    step = w / len(values)
+    mid = h / 2
+    for i, v in enumerate(values):
+        half = max(1.0, v / 100 * (mid - 1))
+        x = i * step
+        draw.rectangle((x, mid - half, x + max(1.0, step - 1), mid + half), fill=(120, 190, 255, 255))
+    return img
+
+
+def format_level(value: float) -> str:
+    """Рівень 0..1 від повної шкали в дБFS"""
+    if not value or value <= 0:
+        return "-∞"
+    return f"{20 * math.log10(value):.1f}"
+
+
+class ImagePipeline:
+    """Пул фонових потоків для декодування зображень; готове забирається з черги done"""
+
+    def __init__(self, workers: int = 2, cache_items: int = 8, budget_bytes: int = 256 * 1024 * 1024):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image")
+        # один потік для завдань, які мають іти строго по черзі (кадри GIF)
+        self._serial = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-serial")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._used = 0
+        self._pending = set()
+        self.cache_items = cache_items
+        self.budget_bytes = budget_bytes
+        self.done = queue.Queue()
+
+    @staticmethod
+    def key_for(path: str, size: tuple):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        return (path, mtime, int(size[0]), int(size[1]))
+
+    def get(self, key):
+        """Готове зображення з кешу або None"""
+        with self._lock:
+            img = self._cache.get(key)
+            if img is not None:
+                self._cache.move_to_end(key)
+            return img
+
+    def request(self, key, job=None, cache: bool = True, serial: bool = False) -> bool:
+        """Ставить ключ у чергу на обробку; False, якщо він уже в роботі"""
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        if job is None:
+            job = lambda: load_fitted_image(key[0], (key[2], key[3]))
+        (self._serial if serial else self._pool).submit(self._run, key, job, cache)
+        return True
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    @staticmethod
+    def _size_of(img) -> int:
+        if isinstance(img, Image.Image):
+            return img.width * img.height * len(img.getbands())
+        return 0
+
+    def _run(self, key, job, cache: bool):
+        try:
+            img = job()
+            if cache:
+                self._store(key, img)
+            result = (key, img, None)
+        except Exception as e:
+            result = (key, None, e)
+        # спершу результат, потім ключ: інакше _drain_images може побачити
+        # порожню чергу і pending == 0 та перестати перевіряти
+        self.done.put(result)
+        with self._lock:
+            self._pending.discard(key)
+
+    def _store(self, key, img):
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self._used -= self._size_of(old)
+            self._cache[key] = img
+            self._used += self._size_of(img)
+            while len(self._cache) > 1 and (len(self._cache) > self.cache_items or self._used > self.budget_bytes):
+                _k, dropped = self._cache.popitem(last=False)
+                self._used -= self._size_of(dropped)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._serial.shutdown(wait=False, cancel_futures=True)
+
+
+class SlideshowFolder:
+    """Відсортований список зображень у папці для слайдшоу.
+
+    refresh() спершу дивиться лише на mtime самої папки; список файлів
+    перечитується тільки коли він змінився, і тоді в self.files
+    додаються/видаляються лише змінені імена.
+    """
+
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files = []
+        self._names = set()
+        self._mtime = None
+
+    def refresh(self) -> bool:
+        """Оновлює список; True, якщо щось додалося або зникло"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        names = set()
+        if mtime is not None:
+            try:
+                with os.scandir(self.path) as it:
+                    for entry in it:
+                        if entry.name.lower().endswith(self.EXTENSIONS) and entry.is_file():
+                            names.add(entry.name)
+            except OSError:
+                names = set()
+
+        removed = self._names - names
+        added = names - self._names
+        if removed:
+            self.files = [f for f in self.files if f not in removed]
+        for name in sorted(added):
+            self.files.insert(bisect_left(self.files, name), name)
+        self._names = names
+        return bool(added or removed)
+
+    def path_at(self, index: int) -> str:
+        return os.path.join(self.path, self.files[index % len(self.files)])
+
+    def __len__(self):
+        return len(self.files)
+
+
+class StreamRecorder:
+    """Потоковий запис з мікрофона у WAV-файл.
+
+    Колбек sd.InputStream лише кладе блоки в чергу; окремий потік пише їх
+    на диск і рахує RMS-огинаючу вікнами по WINDOW семплів. Пам'ять росте
+    лише на огинаючу, а не на весь звук. save() копіює у фінальний файл
+    тільки відрізок між першим і останнім гучним вікном.
+    """
+
+    WINDOW = 441  # 10 мс при 44.1 кГц
+    PAD_WINDOWS = 10
+    MIN_GATE = 200.0
+    GATE_RATIO = 0.05
+
+    def __init__(self, tmp_path, samplerate: int = 44100, max_seconds: int = 60):
+        self.tmp_path = Path(tmp_path)
+        self.samplerate = samplerate
+        self.max_frames = int(samplerate * max(1, max_seconds))
+        self.frames = 0
+        self._blocks = queue.Queue()
+        self._envelope = []
+        self._tail = None
+        self._sd = None
+        self._stream = None
+        self._writer = None
+        self._wav = None
+
+    @property
+    def active(self) -> bool:
+        return self._stream is not None
+
+    def start(self):
+        import sounddevice as sd
+        self._sd = sd
+        self._wav = wave.open(str(self.tmp_path), "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(self.samplerate)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        try:
+            self._stream = sd.InputStream(samplerate=self.samplerate, channels=1, dtype="int16", callback=self._callback)
+            self._stream.start()
+        except Exception:
+            self._stream = None
+            self._finish_writer()
+            raise
+
+    def _callback(self, indata, frames, time_info, status):
+        room = self.max_frames - self.frames
+        if room <= 0:
+            raise self._sd.CallbackStop()
+        block = indata[:room, 0].copy()
+        self.frames += len(block)
+        self._blocks.put(block)
+
+    def _write_loop(self):
+        import numpy as np
+        while True:
+            block = self._blocks.get()
+            if block is None:
+                break
+            self._wav.writeframes(block.tobytes())
+            data = np.concatenate((self._tail, block)) if self._tail is not None and len(self._tail) else block
+            usable = len(data) // self.WINDOW * self.WINDOW
+            if usable:
+                win = data[:usable].astype(np.float32).reshape(-1, self.WINDOW)
+                self._envelope.append(np.sqrt((win * win).mean(axis=1)))
+            self._tail = data[usable:]
+
+    def _finish_writer(self):
+        if self._writer is not None:
+            self._blocks.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+    def stop(self):
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception:
+                pass
+        self._finish_writer()
+
+    def voiced_range(self):
+        """(перший, останній) кадр над енергетичним порогом або None"""
+        if not self._envelope:
+            return None
+        import numpy as np
+        env = np.concatenate(self._envelope)
+        gate = max(self.MIN_GATE, float(env.max()) * self.GATE_RATIO)
+        loud = np.flatnonzero(env >= gate)
+        if not len(loud):
+            return None
+        first = max(0, int(loud[0]) - self.PAD_WINDOWS)
+        last = min(len(env), int(loud[-1]) + 1 + self.PAD_WINDOWS)
+        return first * self.WINDOW, min(self.frames, last * self.WINDOW)
+
+    def save(self, dest) -> bool:
+        """Записує обрізаний від тиші звук у dest; False, якщо звуку нема"""
+        span = self.voiced_range()
+        if span is None:
+            return False
+        start, end = span
+        with wave.open(str(self.tmp_path), "rb") as src, wave.open(str(dest), "wb") as out:
+            out.setparams(src.getparams())
+            src.setpos(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = src.readframes(min(remaining, self.samplerate))
+                if not chunk:
+                    break
+                out.writeframes(chunk)
+                remaining -= len(chunk) // 2
+        return True
+
+    def discard(self):
+        self.stop()
+        try:
+            self.tmp_path.unlink()
+        except OSError:
+            pass
+
+
+class WidgetView:
+    """Тонкий шар між станом розкладу і віджетами.
+
+    Пам'ятає показані значення і передає в Tk лише ті, що змінилися,
+    щоб не перемальовувати великі шрифти без потреби.
+    """
+
+    PROGRESS_STEP = 0.001
+
+    def __init__(self):
+        self._shown = {}
+
+    def text(self, widget, text: str):
+        key = (id(widget), "text")
+        if self._shown.get(key) == text:
+            return
+        self._shown[key] = text
+        widget.configure(text=text)
+
+    def progress(self, bar, value: float):
+        value = round(max(0.0, min(1.0, value)) / self.PROGRESS_STEP) * self.PROGRESS_STEP
+        key = (id(bar), "progress")
+        if self._shown.get(key) == value:
+            return
+        self._shown[key] = value
+        bar.set(value)
+
+
+class SchoolBellApp(BellCore, ctk.CTk):
     def __init__(self):
         super().__init__()
 
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
 
-        pygame.mixer.init()
-        self._siren_channel = pygame.mixer.Channel(1)
-
-        self.base_dir = app_dir()
-        self.config_path = self.base_dir / CONFIG_NAME
+        self._init_core(app_dir(), StartupTimer(STARTUP_T0))
+        self._startup.mark("imports")
 
         self.title("Шкільний дзвінок")
         self.geometry("1200x700")
@@ -336,60 +659,55 @@ class SchoolBellApp(ctk.CTk):
         self.settings_tab = "main"
 
         self._alarm_overlay_on = False
-        self._alarm_priority = False
 
-        self._time_offset = timedelta(0)
-        self.test_mode_on = False
-
-        self.photo_path = ""
-        self.photo_img_original = None
+        self._images = ImagePipeline(cache_items=12)
+        self._images_drain_job = None
         self._photo_cache_key = None
         self._photo_cache_img = None
+        self._photo_error = None
+
+        self._slideshow = None
+        self._slide_index = 0
+        self._slide_key = None
+        self._slide_want = None
+        self._slide_job = None
+        self._fade_frames = []
+        self._fade_job = None
+        self._fade_target = None
         self._photo_render_job = None
 
-        self.candle_gif_path = ""
-        self._gif_frames = []
+        self._gif_cache = ScaledFrameCache(
+            lambda im: ctk.CTkImage(light_image=im, dark_image=im, size=im.size)
+        )
         self._gif_index = 0
         self._gif_job = None
 
-        self.minute_of_silence_enabled = True
-        self.minute_of_silence_sound_path = ""
-        self._mos_last_date = None
-        self._mos_active = False
-        self._mos_end_time = None
-
-        self.lesson_start_sound_path = ""
-        self.lesson_end_sound_path = ""
-        self.siren_sound_path = ""
-        self._siren_sound = None
-
-        self.ALERTS_TOKEN = ""
-        self.ALERT_UID = 0
-
-        self.silent_mode = False
-
-        self.entry_lock_enabled = False
-        self.entry_password = ""
-
-        self.shutdown_enabled = False
-        self.shutdown_time = "00:00"
-        
         # Для записів звуків
-        self.custom_recordings = {}
         self.is_recording = False
-        self.record_data = None
-        self.record_start_time = None
-        
-        self.hibernation_enabled = False
-        self.hibernation_time = "00:00"
-        
-        self.autostart_enabled = False
-        self._shutdown_last_date = None
-
-        self.schedule = [dict(x) for x in DEFAULT_SCHEDULE_12]
-        self.lesson_rows = []
+        self._recorder = None
+
+        self._editor_rows = []
+        self._editor_slots = []
+        self._editor_top = 0
+        self._editor_binding = False
+        self._editor_version = 0
+        self._editor_shown = None
+        self._editor_source = None
+        self._editor_dirty = {}
+        self._editor_flush_job = None
+        self._fonts = {}
+        self._rec_index = NameIndex()
+        self._rec_names = []
+        self._rec_slots = []
+        self._rec_top = 0
+        self._rec_shown = None
+        self._rec_filter_job = None
+        self._rec_thumbs = {}
+        self._rec_meta_job = None
+        self._view = WidgetView()
 
         self._load_config()
+        self._startup.mark("config")
 
         if self.entry_lock_enabled:
             if not self.entry_password:
@@ -399,18 +717,10 @@ class SchoolBellApp(ctk.CTk):
                     self.destroy()
                     return
 
-        self._worker_stop = threading.Event()
-        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-
-        # КЛЮЧОВЕ ВИПРАВЛЕННЯ: антидубль дзвінків
-        self._bell_fired_keys = set()
-        self._bell_fired_date = None
-
         self._build_ui()
 
         # Background image for entire window (keeps photo image untouched)
-        self._bg_cache_key = None
-        self._bg_cache_img = None
+        self._bg_cache = OrderedDict()
         self._bg_render_job = None
         self._bg_label = ctk.CTkLabel(self, text="")
         self._bg_label.place(x=0, y=0, relwidth=1, relheight=1)
@@ -418,29 +728,48 @@ class SchoolBellApp(ctk.CTk):
             self._bg_label.lower()
         except Exception:
             pass
-        self.bind("<Configure>", lambda e: self._schedule_bg_render())
-        self._schedule_bg_render()
         self._update_clock()
-        self.after(1500, self._poll_air_alert)
+        self._startup.mark("ui")
 
-        self._worker_thread.start()
         self.protocol("WM_DELETE_WINDOW", self.on_close)
+        # решта підсистем — після першого малювання годинника
+        self.after_idle(self._run_startup)
+
+    def _run_startup(self, index: int = 0):
+        """Етапи запуску в порядку потреби, по одному за прохід циклу Tk"""
+        stages = (
+            ("core", self._start_core),
+            ("images", self._start_images),
+            ("watchers", self._start_watchers),
+        )
+        if index == 0:
+            self._startup.mark("paint")
+        if index < len(stages):
+            stage, fn = stages[index]
+            try:
+                fn()
+            except Exception:
+                pass
+            self._startup.mark(stage)
+            self.after(1, lambda: self._run_startup(index + 1))
+        else:
+            self._finish_startup()
 
-    def _resolve_path(self, path: str) -> str:
-        if not path:
-            return ""
-        try:
-            if os.path.isabs(path):
-                return path
-            return str((self.base_dir / path).resolve())
-        except Exception:
-            return path
+    def _start_images(self):
+        self.bind("<Configure>", lambda e: self._schedule_bg_render())
+        self._schedule_bg_render()
+        self._setup_slideshow()
 
-    def _basename(self, path: str) -> str:
-        try:
-            return os.path.basename(path) if path else ""
-        except Exception:
-            return ""
+    def _start_watchers(self):
+        self.after(CONFIG_WATCH_MS, self._watch_config)
+        self.after(500, self._poll_air_alert)
+
+    def _finish_startup(self):
+        """Записує звіт про запуск, щойно фоновий старт аудіо завершився"""
+        if not self._startup.has("audio"):
+            self.after(200, self._finish_startup)
+            return
+        self._startup.save(self.base_dir / STARTUP_LOG_NAME)
 
     def _go_fullscreen_geometry(self):
         w = self.winfo_screenwidth()
@@ -556,12 +885,6 @@ class SchoolBellApp(ctk.CTk):
         self.btn_tab_recordings = ctk.CTkButton(tabs, text="🎙 Записи", command=lambda: self._set_settings_tab("recordings"))
         self.btn_tab_recordings.grid(row=0, column=2, padx=(4, 0), pady=10, sticky="ew")
 
-        self.btn_tab_main = ctk.CTkButton(tabs, text="Основне", command=lambda: self._set_settings_tab("main"))
-        self.btn_tab_main.grid(row=0, column=0, padx=(0, 8), pady=10, sticky="ew")
-
-        self.btn_tab_extra = ctk.CTkButton(tabs, text="Додатково", command=lambda: self._set_settings_tab("extra"))
-        self.btn_tab_extra.grid(row=0, column=1, padx=(8, 0), pady=10, sticky="ew")
-
         self.panel_main = ctk.CTkFrame(self.settings_view, corner_radius=18)
         self.panel_main.grid(row=2, column=0, padx=18, pady=(0, 18), sticky="nsew")
         self.panel_main.grid_columnconfigure(0, weight=1)
@@ -584,10 +907,6 @@ class SchoolBellApp(ctk.CTk):
         self._build_recordings_panel()
         self._set_settings_tab(self.settings_tab)
 
-        self._build_main_panel()
-        self._build_extra_panel()
-        self._set_settings_tab(self.settings_tab)
-
         self.candle_view = ctk.CTkFrame(self.right, corner_radius=18)
         self.candle_view.grid(row=0, column=0, sticky="nsew", padx=16, pady=16)
         self.candle_view.grid_remove()
@@ -618,7 +937,7 @@ class SchoolBellApp(ctk.CTk):
         self.alarm_btn = ctk.CTkButton(self.alarm_overlay, text="Сховати", width=220, height=48, command=self._hide_alarm_overlay)
         self.alarm_btn.place(relx=0.5, rely=0.73, anchor="center")
 
-        self.alarm_map_btn = ctk.CTkButton(self.alarm_overlay, text="Відкрити мапу тривог", width=260, height=48, command=lambda: webbrowser.open("https://alerts.in.ua/mini"))
+        self.alarm_map_btn = ctk.CTkButton(self.alarm_overlay, text="Відкрити мапу тривог", width=260, height=48, command=self._open_alert_map)
         self.alarm_map_btn.place(relx=0.5, rely=0.82, anchor="center")
 
         self._show_right("photo")
@@ -646,8 +965,8 @@ class SchoolBellApp(ctk.CTk):
         test_row.grid_columnconfigure(0, weight=1)
         test_row.grid_columnconfigure(1, weight=1)
 
-        ctk.CTkButton(test_row, text="Тест урок", command=lambda: self._play_sound(self.lesson_start_sound_path)).grid(row=0, column=0, padx=(0, 8), pady=10, sticky="ew")
-        ctk.CTkButton(test_row, text="Тест кінець", command=lambda: self._play_sound(self.lesson_end_sound_path)).grid(row=0, column=1, padx=(8, 0), pady=10, sticky="ew")
+        ctk.CTkButton(test_row, text="Тест урок", command=lambda: self._play_sound(self.lesson_start_sound_path, AudioEngine.PREVIEW)).grid(row=0, column=0, padx=(0, 8), pady=10, sticky="ew")
+        ctk.CTkButton(test_row, text="Тест кінець", command=lambda: self._play_sound(self.lesson_end_sound_path, AudioEngine.PREVIEW)).grid(row=0, column=1, padx=(8, 0), pady=10, sticky="ew")
 
         self.btn_pick_siren = ctk.CTkButton(p, text="", command=self._pick_siren_sound)
         self.btn_pick_siren.grid(row=4, column=0, padx=12, pady=(0, 10), sticky="ew")
@@ -660,8 +979,8 @@ class SchoolBellApp(ctk.CTk):
         self.token_var = ctk.StringVar(value=self.ALERTS_TOKEN)
         ctk.CTkEntry(token_box, textvariable=self.token_var).grid(row=0, column=1, padx=10, pady=10, sticky="ew")
 
-        ctk.CTkLabel(token_box, text="UID").grid(row=1, column=0, padx=10, pady=(0, 10), sticky="w")
-        self.uid_var = ctk.StringVar(value=str(self.ALERT_UID))
+        ctk.CTkLabel(token_box, text="UID (через кому)").grid(row=1, column=0, padx=10, pady=(0, 10), sticky="w")
+        self.uid_var = ctk.StringVar(value=", ".join(str(u) for u in self.ALERT_UIDS))
         ctk.CTkEntry(token_box, textvariable=self.uid_var).grid(row=1, column=1, padx=10, pady=(0, 10), sticky="ew")
 
         ctk.CTkButton(p, text="Зберегти", command=self._save_config).grid(row=6, column=0, padx=12, pady=(0, 12), sticky="ew")
@@ -675,15 +994,22 @@ class SchoolBellApp(ctk.CTk):
         header.grid(row=0, column=0, padx=10, pady=(10, 8), sticky="ew")
         header.grid_columnconfigure(0, weight=1)
 
-        ctk.CTkLabel(header, text="Розклад на всі дні (12 уроків)").grid(row=0, column=0, padx=10, pady=10, sticky="w")
-        ctk.CTkButton(header, text="Застосувати", command=self._apply_editor_to_schedule).grid(row=0, column=1, padx=10, pady=10, sticky="e")
+        self.schedule_title = ctk.CTkLabel(header, text="Основний розклад")
+        self.schedule_title.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        ctk.CTkButton(header, text="+ Урок", width=100, command=self._editor_add_row).grid(row=0, column=1, padx=(10, 0), pady=10, sticky="e")
+        ctk.CTkButton(header, text="Застосувати", command=self._apply_editor_to_schedule).grid(row=0, column=2, padx=10, pady=10, sticky="e")
 
-        ctk.CTkLabel(self.schedule_box, text="Урок     Початок     Кінець     Запис(початок)     Запис(кінець)").grid(row=1, column=0, padx=12, pady=(0, 6), sticky="w")
+        ctk.CTkLabel(self.schedule_box, text="Урок   Зміна     Початок     Кінець     Запис(початок)     Запис(кінець)").grid(row=1, column=0, padx=12, pady=(0, 6), sticky="w")
 
-        self.schedule_list = ctk.CTkScrollableFrame(self.schedule_box, corner_radius=18)
-        self.schedule_list.grid(row=2, column=0, sticky="nsew", padx=10, pady=(0, 10))
+        editor = ctk.CTkFrame(self.schedule_box, corner_radius=18)
+        editor.grid(row=2, column=0, sticky="nsew", padx=10, pady=(0, 10))
+        editor.grid_columnconfigure(0, weight=1)
+        self.schedule_list = ctk.CTkFrame(editor, fg_color="transparent")
+        self.schedule_list.grid(row=0, column=0, sticky="nsew")
+        self.schedule_list.grid_columnconfigure(0, weight=1)
+        self.schedule_scroll = ctk.CTkScrollbar(editor, command=self._editor_yview)
+        self.schedule_scroll.grid(row=0, column=1, sticky="ns", padx=(0, 4), pady=6)
 
-        self._build_schedule_rows(self.schedule_list)
         self._apply_schedule_to_editor()
 
         self.schedule_box.grid_remove()
@@ -766,8 +1092,49 @@ class SchoolBellApp(ctk.CTk):
             row=0, column=0, padx=10, pady=10, sticky="w"
         )
 
+        row8 = ctk.CTkFrame(p, corner_radius=18)
+        row8.grid(row=7, column=0, padx=12, pady=(0, 12), sticky="ew")
+        row8.grid_columnconfigure(0, weight=1)
+
+        self.slideshow_var = ctk.BooleanVar(value=self.slideshow_enabled)
+        ctk.CTkCheckBox(row8, text="Слайдшоу з папки замість фото", variable=self.slideshow_var, command=self._apply_slideshow).grid(
+            row=0, column=0, padx=10, pady=10, sticky="w"
+        )
+        self.btn_pick_slideshow = ctk.CTkButton(row8, text="", command=self._pick_slideshow_dir)
+        self.btn_pick_slideshow.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="ew")
+
+        row9 = ctk.CTkFrame(p, corner_radius=18)
+        row9.grid(row=8, column=0, padx=12, pady=(0, 12), sticky="ew")
+        row9.grid_columnconfigure(0, weight=1)
+        row9.grid_columnconfigure(1, weight=1)
+
+        ctk.CTkLabel(row9, text="Точність дзвінків", font=ctk.CTkFont(size=16, weight="bold")).grid(
+            row=0, column=0, columnspan=2, padx=10, pady=(10, 0), sticky="w"
+        )
+        self.bell_timing_label = ctk.CTkLabel(row9, text="", justify="left", anchor="w", font=ctk.CTkFont(family="Consolas", size=13))
+        self.bell_timing_label.grid(row=1, column=0, columnspan=2, padx=10, pady=6, sticky="ew")
+        ctk.CTkButton(row9, text="Оновити", command=self._refresh_bell_timing).grid(row=2, column=0, padx=(10, 6), pady=(0, 10), sticky="ew")
+        ctk.CTkButton(row9, text="Експорт JSON", command=self._export_bell_timing).grid(row=2, column=1, padx=(6, 10), pady=(0, 10), sticky="ew")
+
         self._refresh_sound_button_titles()
 
+    def _refresh_bell_timing(self):
+        self.bell_timing_label.configure(text=self._bell_timing.report())
+
+    def _export_bell_timing(self):
+        path = filedialog.asksaveasfilename(
+            title="Зберегти виміри дзвінків",
+            defaultextension=".json",
+            initialfile="bell_timing.json",
+            filetypes=[("JSON", "*.json")],
+        )
+        if not path:
+            return
+        try:
+            self._bell_timing.export(path)
+        except Exception as e:
+            messagebox.showerror("Помилка", f"Не вдалося зберегти: {e}")
+
     def _set_settings_tab(self, tab: str):
         self.settings_tab = tab
         self.panel_main.grid_remove()
@@ -778,6 +1145,7 @@ class SchoolBellApp(ctk.CTk):
             self.panel_main.grid()
         elif tab == "extra":
             self.panel_extra.grid()
+            self._refresh_bell_timing()
         elif tab == "recordings":
             self.panel_recordings.grid()
             self._refresh_recordings_list()
@@ -786,7 +1154,7 @@ class SchoolBellApp(ctk.CTk):
 
     def _show_right(self, mode: str):
         if self.right_mode == "candle" and mode != "candle":
-            self._stop_candle_gif()
+            self._release_gif()
 
         self.right_mode = mode
         self.photo_view.grid_remove()
@@ -813,6 +1181,9 @@ class SchoolBellApp(ctk.CTk):
         if self.schedule_box.winfo_ismapped():
             self.schedule_box.grid_remove()
         else:
+            if not self._editor_slots:
+                self._build_schedule_rows(self.schedule_list)
+                self._render_editor()
             self.schedule_box.grid()
 
     def _minimize(self):
@@ -844,13 +1215,7 @@ class SchoolBellApp(ctk.CTk):
             return
 
         self.photo_path = path
-        try:
-            self.photo_img_original = Image.open(self.photo_path).convert("RGBA")
-        except Exception as e:
-            self.photo_img_original = None
-            messagebox.showerror("Помилка", f"Не вдалося завантажити фото:\n{e}")
-            return
-
+        self._photo_error = None
         self._photo_cache_key = None
         self._photo_cache_img = None
         self._schedule_photo_render()
@@ -869,7 +1234,12 @@ class SchoolBellApp(ctk.CTk):
         if self.right_mode != "photo":
             return
 
-        if not self.photo_img_original:
+        if self._slideshow_active():
+            self._render_slide()
+            return
+
+        p = self._resolve_path(self.photo_path)
+        if not p or not os.path.exists(p):
             self.photo_label.configure(text="Фото не вибране", image=None)
             return
 
@@ -879,23 +1249,197 @@ class SchoolBellApp(ctk.CTk):
         if w < 100 or h < 100:
             return
 
-        key = (w, h, id(self.photo_img_original))
+        key = ImagePipeline.key_for(p, (w, h))
+        if key is None:
+            return
         if self._photo_cache_key == key and self._photo_cache_img is not None:
             self.photo_label.configure(image=self._photo_cache_img, text="")
             self.photo_label.image = self._photo_cache_img
             return
 
-        try:
-            # Resize image to fit without any effects
-            photo = ImageOps.contain(self.photo_img_original, (w, h), method=Image.Resampling.LANCZOS)
-            cimg = ctk.CTkImage(light_image=photo, dark_image=photo, size=(photo.width, photo.height))
-            self._photo_cache_key = key
-            self._photo_cache_img = cimg
-
-            self.photo_label.configure(image=cimg, text="")
-            self.photo_label.image = cimg
-        except Exception as e:
-            self.photo_label.configure(text=f"Помилка фото:\n{e}", image=None)
+        photo = self._images.get(key)
+        if photo is not None:
+            self._show_photo(key, photo)
+            return
+        if self._photo_error and self._photo_error[0] == key:
+            self.photo_label.configure(text=f"Помилка фото:\n{self._photo_error[1]}", image=None)
+            return
+        self._images.request(key)
+        self._schedule_images_drain()
+
+    def _show_photo(self, key, photo: Image.Image):
+        cimg = ctk.CTkImage(light_image=photo, dark_image=photo, size=(photo.width, photo.height))
+        self._photo_cache_key = key
+        self._photo_cache_img = cimg
+        self.photo_label.configure(image=cimg, text="")
+        self.photo_label.image = cimg
+
+    def _schedule_images_drain(self):
+        if self._images_drain_job is None:
+            self._images_drain_job = self.after(40, self._drain_images)
+
+    def _drain_images(self):
+        """Забирає готові зображення з фонового пулу (Tk-потік)"""
+        self._images_drain_job = None
+        while True:
+            try:
+                key, img, err = self._images.done.get_nowait()
+            except queue.Empty:
+                break
+            if err is not None:
+                self._photo_error = (key, err)
+            self._on_image_ready(key, img, err)
+        if self._images.pending:
+            self._schedule_images_drain()
+
+    def _on_image_ready(self, key, img, err):
+        if key[0] == "rec":
+            self._on_recording_meta_ready(key, img)
+            return
+        if key[0] == "gif":
+            self._gif_cache.put(key, img)
+            return
+        if key[0] == "bg":
+            if img is not None:
+                self._on_bg_ready(key, img)
+            return
+        if key[0] == "fade":
+            if img and key == self._slide_want:
+                self._play_fade(img)
+            return
+        if self._slideshow_active():
+            if key == self._slide_want:
+                self._show_next_slide()
+            return
+        if key[0] == self._resolve_path(self.photo_path):
+            self._schedule_photo_render()
+
+    def _slideshow_active(self) -> bool:
+        return bool(self.slideshow_enabled and self._slideshow is not None and len(self._slideshow))
+
+    def _setup_slideshow(self):
+        """(Пере)створює слайдшоу після зміни налаштувань"""
+        self._cancel_slide_jobs()
+        self._slideshow = None
+        self._slide_index = 0
+        self._slide_key = None
+        self._slide_want = None
+        if self.slideshow_enabled and self.slideshow_dir:
+            self._slideshow = SlideshowFolder(self._resolve_path(self.slideshow_dir))
+            self._slideshow.refresh()
+            self._slide_job = self.after(self.slideshow_interval_seconds * 1000, self._slideshow_tick)
+        self._photo_cache_key = None
+        self._schedule_photo_render()
+
+    def _cancel_slide_jobs(self):
+        for attr in ("_slide_job", "_fade_job"):
+            job = getattr(self, attr)
+            if job:
+                try:
+                    self.after_cancel(job)
+                except Exception:
+                    pass
+            setattr(self, attr, None)
+        self._fade_frames = []
+
+    def _slide_size(self):
+        w = self.photo_view.winfo_width()
+        h = self.photo_view.winfo_height()
+        return (w, h) if w >= 100 and h >= 100 else None
+
+    def _slide_key_at(self, index: int, size: tuple):
+        return ImagePipeline.key_for(self._slideshow.path_at(index), size)
+
+    def _prefetch_slides(self, size: tuple):
+        for i in range(1, self.slideshow_prefetch + 1):
+            key = self._slide_key_at(self._slide_index + i, size)
+            if key is not None and self._images.get(key) is None:
+                self._images.request(key)
+        self._schedule_images_drain()
+
+    def _render_slide(self):
+        """Показує поточний слайд під поточний розмір (без переходу)"""
+        size = self._slide_size()
+        if size is None:
+            return
+        key = self._slide_key_at(self._slide_index, size)
+        if key is None:
+            return
+        img = self._images.get(key)
+        if img is None:
+            self._slide_want = key
+            self._images.request(key)
+            self._schedule_images_drain()
+            return
+        if key != self._slide_key:
+            self._set_slide_image(key, img)
+        self._prefetch_slides(size)
+
+    def _set_slide_image(self, key, img: Image.Image):
+        self._slide_key = key
+        self._slide_want = None
+        cimg = ctk.CTkImage(light_image=img, dark_image=img, size=(img.width, img.height))
+        self.photo_label.configure(image=cimg, text="")
+        self.photo_label.image = cimg
+
+    def _slideshow_tick(self):
+        self._slide_job = self.after(self.slideshow_interval_seconds * 1000, self._slideshow_tick)
+        if self._slideshow is None or self.right_mode != "photo" or self._fade_frames:
+            return
+        if self._slideshow.refresh() and not len(self._slideshow):
+            self._photo_cache_key = None
+            self._schedule_photo_render()
+            return
+        if not len(self._slideshow):
+            return
+        size = self._slide_size()
+        if size is None:
+            return
+        self._slide_index = (self._slide_index + 1) % len(self._slideshow)
+        self._slide_want = self._slide_key_at(self._slide_index, size)
+        if self._slide_want is None:
+            return
+        if self._images.get(self._slide_want) is None:
+            self._images.request(self._slide_want)
+            self._schedule_images_drain()
+            return
+        self._show_next_slide()
+
+    def _show_next_slide(self):
+        """Запускає перехід до self._slide_want, коли його кадр у кеші"""
+        nxt = self._images.get(self._slide_want)
+        prev = self._images.get(self._slide_key) if self._slide_key else None
+        size = self._slide_size()
+        if nxt is None or size is None:
+            return
+        if prev is None or self._slide_key[2:] != self._slide_want[2:]:
+            self._set_slide_image(self._slide_want, nxt)
+            self._prefetch_slides(size)
+            return
+        target = self._slide_want
+        fade_key = ("fade", self._slide_key, target)
+        self._slide_want = fade_key
+        self._fade_target = (target, nxt)
+        self._images.request(fade_key, lambda: make_crossfade(prev, nxt, size, 8), cache=False)
+        self._schedule_images_drain()
+
+    def _play_fade(self, frames: list):
+        self._fade_frames = [ctk.CTkImage(light_image=f, dark_image=f, size=f.size) for f in frames]
+        self._fade_step()
+
+    def _fade_step(self):
+        self._fade_job = None
+        if not self._fade_frames:
+            key, img = self._fade_target
+            self._set_slide_image(key, img)
+            size = self._slide_size()
+            if size is not None:
+                self._prefetch_slides(size)
+            return
+        cimg = self._fade_frames.pop(0)
+        self.photo_label.configure(image=cimg, text="")
+        self.photo_label.image = cimg
+        self._fade_job = self.after(50, self._fade_step)
 
     def _schedule_bg_render(self):
         if self._bg_render_job:
@@ -913,19 +1457,28 @@ class SchoolBellApp(ctk.CTk):
             return
 
         key = (w, h)
-        if self._bg_cache_key == key and self._bg_cache_img is not None:
-            try:
-                self._bg_label.configure(image=self._bg_cache_img)
-                self._bg_label.image = self._bg_cache_img
-            except Exception:
-                pass
+        cimg = self._bg_cache.get(key)
+        if cimg is None:
+            # фон рендериться (або читається з кешу на диску) у фоновому пулі
+            cache_dir = self.base_dir / BG_CACHE_DIR
+            if self._images.request(("bg", w, h), job=lambda: load_blue_bg(w, h, cache_dir), cache=False):
+                self._schedule_images_drain()
             return
-
+        self._bg_cache.move_to_end(key)
+        self._apply_bg(cimg)
+
+    def _on_bg_ready(self, key, img):
+        _, w, h = key
+        cimg = ctk.CTkImage(light_image=img, dark_image=img, size=(w, h))
+        self._bg_cache[(w, h)] = cimg
+        while len(self._bg_cache) > 3:
+            self._bg_cache.popitem(last=False)
+        if (self.winfo_width(), self.winfo_height()) == (w, h):
+            self._apply_bg(cimg)
+            self._startup.mark("background")
+
+    def _apply_bg(self, cimg):
         try:
-            bg = make_blue_bg(w, h)
-            cimg = ctk.CTkImage(light_image=bg, dark_image=bg, size=(w, h))
-            self._bg_cache_key = key
-            self._bg_cache_img = cimg
             self._bg_label.configure(image=cimg)
             self._bg_label.image = cimg
             try:
@@ -965,6 +1518,9 @@ class SchoolBellApp(ctk.CTk):
             self.btn_pick_mos.configure(text=tm)
         if hasattr(self, "btn_set_shutdown"):
             self.btn_set_shutdown.configure(text=f"Час вимкнення: {getattr(self, 'shutdown_time', '00:00')}")
+        if hasattr(self, "btn_pick_slideshow"):
+            sd_name = self._basename(getattr(self, "slideshow_dir", ""))
+            self.btn_pick_slideshow.configure(text=f"Папка слайдшоу  {sd_name}" if sd_name else "Обрати папку слайдшоу")
         if hasattr(self, "btn_set_hibernation"):
             self.btn_set_hibernation.configure(text=f"Час гібернації: {getattr(self, 'hibernation_time', '00:00')}")
 
@@ -972,6 +1528,7 @@ class SchoolBellApp(ctk.CTk):
         path = filedialog.askopenfilename(title="Обери звук на урок", filetypes=[("Audio", "*.wav *.mp3 *.ogg"), ("All files", "*.*")])
         if path:
             self.lesson_start_sound_path = path
+            self._preload_sounds()
             self._refresh_sound_button_titles()
             self._save_config()
 
@@ -979,6 +1536,7 @@ class SchoolBellApp(ctk.CTk):
         path = filedialog.askopenfilename(title="Обери звук на кінець уроку", filetypes=[("Audio", "*.wav *.mp3 *.ogg"), ("All files", "*.*")])
         if path:
             self.lesson_end_sound_path = path
+            self._preload_sounds()
             self._refresh_sound_button_titles()
             self._save_config()
 
@@ -986,118 +1544,71 @@ class SchoolBellApp(ctk.CTk):
         path = filedialog.askopenfilename(title="Обери звук сирени", filetypes=[("Audio", "*.wav *.mp3 *.ogg"), ("All files", "*.*")])
         if not path:
             return
+        if self._sound_bank.get(self._resolve_path(path)) is None:
+            messagebox.showerror("Помилка", "Не вдалося завантажити сирену.")
+            return
         self.siren_sound_path = path
-        p = self._resolve_path(self.siren_sound_path)
-        try:
-            self._siren_sound = pygame.mixer.Sound(p)
-            self._siren_sound.set_volume(1.0)
-            self._refresh_sound_button_titles()
-            self._save_config()
-        except Exception as e:
-            self._siren_sound = None
-            messagebox.showerror("Помилка", f"Не вдалося завантажити сирену:\n{e}")
+        self._refresh_sound_button_titles()
+        self._save_config()
 
     def _pick_mos_sound(self):
         path = filedialog.askopenfilename(title="Обери звук на хвилину мовчання", filetypes=[("Audio", "*.wav *.mp3 *.ogg"), ("All files", "*.*")])
         if path:
             self.minute_of_silence_sound_path = path
+            self._preload_sounds()
             self._refresh_sound_button_titles()
             self._save_config()
 
-    def _stop_all_non_alarm_audio(self):
-        try:
-            pygame.mixer.music.stop()
-        except Exception:
-            pass
-
-    def _play_sound(self, path: str):
-        if self._alarm_priority:
-            return
-        p = self._resolve_path(path)
-        if not p or not os.path.exists(p):
-            return
-        try:
-            pygame.mixer.music.stop()
-            pygame.mixer.music.set_volume(1.0)
-            pygame.mixer.music.load(p)
-            pygame.mixer.music.play()
-        except Exception:
-            pass
-
-    def _start_siren(self):
-        if not self._siren_sound:
-            p = self._resolve_path(self.siren_sound_path)
-            if p and os.path.exists(p):
-                try:
-                    self._siren_sound = pygame.mixer.Sound(p)
-                    self._siren_sound.set_volume(1.0)
-                except Exception:
-                    self._siren_sound = None
-
-        if self._siren_sound and not self._siren_channel.get_busy():
-            try:
-                self._siren_channel.play(self._siren_sound, loops=-1)
-            except Exception:
-                pass
-
-    def _stop_siren(self):
-        try:
-            if self._siren_channel.get_busy():
-                self._siren_channel.stop()
-        except Exception:
-            pass
-
     def _pick_candle_gif(self):
         path = filedialog.askopenfilename(title="Обери гіфку (gif)", filetypes=[("GIF", "*.gif"), ("All files", "*.*")])
         if not path:
             return
         self.candle_gif_path = path
-        self._load_gif_frames()
+        self._gif_cache.release()
         self._save_config()
         if self.right_mode == "candle":
             self._start_candle_gif()
 
     def _load_gif_frames(self):
-        self._gif_frames = []
+        """Готує ліниве джерело кадрів; декодування — лише під час показу"""
         self._gif_index = 0
         p = self._resolve_path(self.candle_gif_path)
-        if not p or not os.path.exists(p):
-            return
+        self._gif_cache.set_source(GifSource(p) if p and os.path.exists(p) else None)
+
+    def _release_gif(self):
+        self._stop_candle_gif()
+        self._gif_cache.release()
         try:
-            import imageio
-            reader = imageio.get_reader(p)
-            for frame in reader:
-                self._gif_frames.append(Image.fromarray(frame))
-            try:
-                reader.close()
-            except Exception:
-                pass
+            self.video_label.configure(image=None)
+            self.video_label.image = None
         except Exception:
-            self._gif_frames = []
+            pass
 
     def _start_candle_gif(self):
         self._stop_candle_gif()
-        if not self._gif_frames:
+        self._load_gif_frames()
+        if not len(self._gif_cache):
             self.video_label.configure(text="Гіфка не вибрана або не читається", image=None)
             return
         self._gif_next_frame()
 
     def _gif_next_frame(self):
-        if self.right_mode != "candle" or not self._gif_frames:
+        self._gif_job = None
+        if self.right_mode != "candle" or not len(self._gif_cache):
             return
 
-        img = self._gif_frames[self._gif_index % len(self._gif_frames)]
-        self._gif_index += 1
-
         w = max(320, self.video_label.winfo_width())
         h = max(320, self.video_label.winfo_height())
-        img2 = ImageOps.fit(img, (w, h), method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
+        cimg, duration = self._gif_cache.get(self._gif_index, (w, h))
+        self._gif_index += 1
+        for key, job in self._gif_cache.prefetch(self._gif_index):
+            self._images.request(key, job, cache=False, serial=True)
+        self._schedule_images_drain()
 
-        cimg = ctk.CTkImage(light_image=img2, dark_image=img2, size=(w, h))
         self.video_label.configure(image=cimg, text="")
         self.video_label.image = cimg
 
-        self._gif_job = self.after(80, self._gif_next_frame)
+        self._gif_job = self.after(duration, self._gif_next_frame)
 
     def _stop_candle_gif(self):
         if self._gif_job:
@@ -1135,6 +1646,7 @@ class SchoolBellApp(ctk.CTk):
 
     def _apply_shutdown_enabled(self):
         self.shutdown_enabled = bool(self.shutdown_var.get())
+        self._worker_wake.set()
         self._save_config()
 
     def _set_shutdown_time(self):
@@ -1146,6 +1658,7 @@ class SchoolBellApp(ctk.CTk):
             messagebox.showerror("Помилка", "Введи час у форматі HH:MM, наприклад 18:30")
             return
         self.shutdown_time = s
+        self._worker_wake.set()
         self._refresh_sound_button_titles()
         self._save_config()
 
@@ -1165,6 +1678,19 @@ class SchoolBellApp(ctk.CTk):
         self._refresh_sound_button_titles()
         self._save_config()
 
+    def _pick_slideshow_dir(self):
+        path = filedialog.askdirectory(title="Обери папку зі слайдами")
+        if not path:
+            return
+        self.slideshow_dir = path
+        self._setup_slideshow()
+        self._save_config()
+
+    def _apply_slideshow(self):
+        self.slideshow_enabled = bool(self.slideshow_var.get())
+        self._setup_slideshow()
+        self._save_config()
+
     def _apply_autostart(self):
         self.autostart_enabled = bool(self.autostart_var.get())
         self._save_config()
@@ -1191,81 +1717,209 @@ class SchoolBellApp(ctk.CTk):
         except Exception as e:
             messagebox.showerror("Помилка", f"Не вдалося налаштувати автозагрузку:\n{e}")
 
-    def _build_schedule_rows(self, parent):
-        for w in parent.winfo_children():
-            w.destroy()
-        self.lesson_rows.clear()
+    def _font(self, size: int, weight: str = "normal"):
+        """Спільний об'єкт шрифту: однакові рядки не створюють власних CTkFont"""
+        key = (size, weight)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = ctk.CTkFont(size=size, weight=weight)
+        return font
 
-        for i in range(1, 13):
+    def _build_schedule_rows(self, parent):
+        """Створює фіксований набір рядків редактора; уроки лише прив'язуються до них.
+
+        Скільки б уроків не було в розкладі, віджетів рівно EDITOR_VISIBLE_ROWS:
+        прокрутка змінює, який відрізок _editor_rows показують ці рядки.
+        Будується один раз, при першому відкритті розкладу.
+        """
+        self._editor_slots.clear()
+        self._editor_shown = None
+        font = self._font(16)
+
+        for k in range(EDITOR_VISIBLE_ROWS):
+            shift_var = ctk.StringVar(value="")
             start_var = ctk.StringVar(value="")
             end_var = ctk.StringVar(value="")
-            start_rec_var = ctk.StringVar(value="")
-            end_rec_var = ctk.StringVar(value="")
 
             row = ctk.CTkFrame(parent, corner_radius=14)
-            row.grid(row=i, column=0, sticky="ew", padx=8, pady=6)
-            row.grid_columnconfigure(0, minsize=80)
-            row.grid_columnconfigure(1, weight=1)
+            row.grid(row=k, column=0, sticky="ew", padx=8, pady=6)
+            row.grid_columnconfigure(0, minsize=60)
             row.grid_columnconfigure(2, weight=1)
             row.grid_columnconfigure(3, weight=1)
             row.grid_columnconfigure(4, weight=1)
+            row.grid_columnconfigure(5, weight=1)
 
-            ctk.CTkLabel(row, text=str(i), width=70, anchor="center").grid(row=0, column=0, padx=(10, 6), pady=12, sticky="ew")
-            ctk.CTkEntry(row, textvariable=start_var, justify="center", font=ctk.CTkFont(size=16)).grid(row=0, column=1, padx=6, pady=12, sticky="ew")
-            ctk.CTkEntry(row, textvariable=end_var, justify="center", font=ctk.CTkFont(size=16)).grid(row=0, column=2, padx=(6, 6), pady=12, sticky="ew")
+            n_label = ctk.CTkLabel(row, text="", width=50, anchor="center")
+            n_label.grid(row=0, column=0, padx=(10, 4), pady=12, sticky="ew")
+            shift_entry = ctk.CTkEntry(row, textvariable=shift_var, justify="center", width=50, font=font)
+            shift_entry.grid(row=0, column=1, padx=4, pady=12)
+            start_entry = ctk.CTkEntry(row, textvariable=start_var, justify="center", font=font)
+            start_entry.grid(row=0, column=2, padx=6, pady=12, sticky="ew")
+            end_entry = ctk.CTkEntry(row, textvariable=end_var, justify="center", font=font)
+            end_entry.grid(row=0, column=3, padx=(6, 6), pady=12, sticky="ew")
 
             # Attach recording buttons for start/end
             # Buttons show current attached recording name or 'Прикріпити'
-            attach_start_btn = ctk.CTkButton(row, text=(start_rec_var.get() or "Прикріпити"), width=160, command=lambda idx=i-1: self._attach_recording_dialog(idx, "start"))
-            attach_start_btn.grid(row=0, column=3, padx=4, pady=12, sticky="ew")
-            attach_end_btn = ctk.CTkButton(row, text=(end_rec_var.get() or "Прикріпити"), width=160, command=lambda idx=i-1: self._attach_recording_dialog(idx, "end"))
-            attach_end_btn.grid(row=0, column=4, padx=(4, 10), pady=12, sticky="ew")
-
-            # Keep buttons updated when var changes
-            def _make_updater(btn, var):
-                def _upd(*a, btn=btn, var=var):
-                    val = var.get() or "Прикріпити"
-                    try:
-                        btn.configure(text=val)
-                    except Exception:
-                        pass
-                return _upd
-
-            start_rec_var.trace_add("write", _make_updater(attach_start_btn, start_rec_var))
-            end_rec_var.trace_add("write", _make_updater(attach_end_btn, end_rec_var))
-
-            self.lesson_rows.append((i, start_var, end_var, start_rec_var, end_rec_var))
+            attach_start_btn = ctk.CTkButton(row, text="Прикріпити", width=140, command=lambda k=k: self._attach_recording_dialog(self._editor_top + k, "start"))
+            attach_start_btn.grid(row=0, column=4, padx=4, pady=12, sticky="ew")
+            attach_end_btn = ctk.CTkButton(row, text="Прикріпити", width=140, command=lambda k=k: self._attach_recording_dialog(self._editor_top + k, "end"))
+            attach_end_btn.grid(row=0, column=5, padx=4, pady=12, sticky="ew")
+            ctk.CTkButton(row, text="✕", width=36, command=lambda k=k: self._editor_delete_row(self._editor_top + k)).grid(
+                row=0, column=6, padx=(4, 10), pady=12
+            )
+
+            for var in (shift_var, start_var, end_var):
+                var.trace_add("write", lambda *a, k=k: self._editor_mark_dirty(k))
+
+            for w in (row, n_label, shift_entry, start_entry, end_entry):
+                w.bind("<MouseWheel>", self._editor_wheel)
+                w.bind("<Button-4>", self._editor_wheel)
+                w.bind("<Button-5>", self._editor_wheel)
+
+            self._editor_slots.append((row, n_label, shift_var, start_var, end_var, attach_start_btn, attach_end_btn))
+
+        for w in (parent, self.schedule_scroll):
+            w.bind("<MouseWheel>", self._editor_wheel)
+            w.bind("<Button-4>", self._editor_wheel)
+            w.bind("<Button-5>", self._editor_wheel)
+
+    def _render_editor(self):
+        """Прив'язує видиму частину _editor_rows до рядків-віджетів.
+
+        Нічого не робить, якщо ні дані, ні позиція прокрутки не змінилися;
+        інакше в Tk передаються лише ті значення, що відрізняються від показаних.
+        """
+        self._flush_editor_writes()
+        rows = self._editor_rows
+        self._editor_top = max(0, min(self._editor_top, len(rows) - EDITOR_VISIBLE_ROWS))
+        state = (self._editor_version, self._editor_top, len(self._editor_slots))
+        if state == self._editor_shown:
+            return
+        self._editor_shown = state
+
+        view = self._view
+        self._editor_binding = True
+        try:
+            for k, (frame, n_label, shift_var, start_var, end_var, start_btn, end_btn) in enumerate(self._editor_slots):
+                idx = self._editor_top + k
+                if idx >= len(rows):
+                    frame.grid_remove()
+                    continue
+                item = rows[idx]
+                frame.grid()
+                view.text(n_label, str(item.get("n", "")))
+                for var, value in ((shift_var, str(item.get("shift", 1))), (start_var, item.get("start", "")), (end_var, item.get("end", ""))):
+                    if var.get() != value:
+                        var.set(value)
+                view.text(start_btn, item.get("recording_start") or "Прикріпити")
+                view.text(end_btn, item.get("recording_end") or "Прикріпити")
+        finally:
+            self._editor_binding = False
+
+        total = max(1, len(rows))
+        self.schedule_scroll.set(self._editor_top / total, min(1.0, (self._editor_top + EDITOR_VISIBLE_ROWS) / total))
+        shifts = len({it.get("shift", 1) for it in rows})
+        view.text(self.schedule_title, f"Основний розклад: {len(rows)} уроків, змін: {shifts}")
+
+    def _editor_mark_dirty(self, k: int):
+        """Запам'ятовує змінений рядок; самі значення забираються одним проходом у after_idle"""
+        if self._editor_binding:
+            return
+        self._editor_dirty[k] = self._editor_top + k
+        if self._editor_flush_job is None:
+            self._editor_flush_job = self.after_idle(self._flush_editor_writes)
+
+    def _flush_editor_writes(self):
+        """Переносить набране в рядках-віджетах назад у _editor_rows"""
+        if self._editor_flush_job is not None:
+            try:
+                self.after_cancel(self._editor_flush_job)
+            except Exception:
+                pass
+            self._editor_flush_job = None
+        dirty, self._editor_dirty = self._editor_dirty, {}
+        for k, idx in dirty.items():
+            if idx >= len(self._editor_rows):
+                continue
+            _, _, shift_var, start_var, end_var, _, _ = self._editor_slots[k]
+            item = self._editor_rows[idx]
+            item["shift"] = max(1, safe_int(shift_var.get().strip(), 1))
+            item["start"] = start_var.get().strip()
+            item["end"] = end_var.get().strip()
+
+    def _editor_changed(self):
+        self._editor_version += 1
+        self._render_editor()
+
+    def _editor_scroll_to(self, top: int):
+        top = max(0, min(int(top), len(self._editor_rows) - EDITOR_VISIBLE_ROWS))
+        if top != self._editor_top:
+            self._flush_editor_writes()
+            self._editor_top = top
+            self._render_editor()
+
+    def _editor_yview(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._editor_scroll_to(round(float(args[1]) * len(self._editor_rows)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (EDITOR_VISIBLE_ROWS if args[2] == "pages" else 1)
+            self._editor_scroll_to(self._editor_top + step)
+
+    @staticmethod
+    def _wheel_step(event) -> int:
+        """Крок прокрутки коліщатком: Button-4/5 на Linux, delta на Windows/macOS"""
+        if getattr(event, "num", None) == 4:
+            return -1
+        if getattr(event, "num", None) == 5:
+            return 1
+        return -1 if event.delta > 0 else 1
+
+    def _editor_wheel(self, event):
+        self._editor_scroll_to(self._editor_top + self._wheel_step(event))
+        return "break"
+
+    def _editor_add_row(self):
+        self._flush_editor_writes()
+        last = self._editor_rows[-1] if self._editor_rows else {}
+        self._editor_rows.append({"n": "", "shift": last.get("shift", 1), "start": "", "end": ""})
+        self._editor_top = len(self._editor_rows)
+        self._editor_changed()
+
+    def _editor_delete_row(self, idx: int):
+        self._flush_editor_writes()
+        if 0 <= idx < len(self._editor_rows):
+            del self._editor_rows[idx]
+            self._editor_changed()
 
     def _apply_schedule_to_editor(self):
-        items = self.schedule
-        for idx in range(12):
-            n, sv, ev, srv, erv = self.lesson_rows[idx]
-            item = items[idx] if idx < len(items) else None
-            sv.set(item.get("start", "") if item else "")
-            ev.set(item.get("end", "") if item else "")
-            srv.set(item.get("recording_start", "") if item else "")
-            erv.set(item.get("recording_end", "") if item else "")
+        """Копіює розклад у редактор; той самий розклад повторно не прив'язується"""
+        if self._editor_source is self.schedule:
+            return
+        self._editor_source = self.schedule
+        self._editor_dirty = {}
+        self._editor_rows = [dict(it, shift=it.get("shift", 1)) for it in self.schedule]
+        self._editor_changed()
 
     def _read_lessons_from_ui(self):
+        self._flush_editor_writes()
         result = []
-        for entry in self.lesson_rows:
-            # entry == (n, start_var, end_var [, start_rec_var, end_rec_var])
-            n = entry[0]
-            s = entry[1].get().strip()
-            e = entry[2].get().strip()
-            rec_start = entry[3].get().strip() if len(entry) > 3 else ""
-            rec_end = entry[4].get().strip() if len(entry) > 4 else ""
+        for entry in self._editor_rows:
+            s = entry.get("start", "").strip()
+            e = entry.get("end", "").strip()
             if not s and not e:
                 continue
             if is_hhmm(s) and is_hhmm(e):
-                item = {"n": n, "start": s, "end": e}
-                if rec_start:
-                    item["recording_start"] = rec_start
-                if rec_end:
-                    item["recording_end"] = rec_end
+                item = {"n": 0, "start": s, "end": e}
+                if entry.get("shift", 1) > 1:
+                    item["shift"] = entry["shift"]
+                if entry.get("recording_start"):
+                    item["recording_start"] = entry["recording_start"]
+                if entry.get("recording_end"):
+                    item["recording_end"] = entry["recording_end"]
                 result.append(item)
-        result.sort(key=lambda x: x["n"])
-        return result
+        return number_lessons(result)
 
     def _attach_recording_dialog(self, row_idx: int, when: str):
         """Open a small dialog to pick a recording for a schedule row.
@@ -1285,12 +1939,10 @@ class SchoolBellApp(ctk.CTk):
         def on_ok():
             sel = listbox.curselection()
             val = names[sel[0]] if sel else ""
-            if 0 <= row_idx < len(self.lesson_rows):
-                entry = self.lesson_rows[row_idx]
-                if when == "start" and len(entry) > 3:
-                    entry[3].set(val)
-                if when == "end" and len(entry) > 4:
-                    entry[4].set(val)
+            self._flush_editor_writes()
+            if 0 <= row_idx < len(self._editor_rows):
+                self._editor_rows[row_idx]["recording_" + when] = val
+                self._editor_changed()
             top.destroy()
 
         btns = ctk.CTkFrame(top)
@@ -1303,216 +1955,96 @@ class SchoolBellApp(ctk.CTk):
         if not rows:
             messagebox.showerror("Помилка", "Розклад порожній.")
             return
-        self.schedule = rows
+        self._set_schedule(rows)
+        self._apply_schedule_to_editor()
         self._save_config()
         messagebox.showinfo("Ок", "Розклад збережено.")
 
-    def _now_dt(self):
-        return now_local() + (self._time_offset if self.test_mode_on else timedelta(0))
-
     def _update_clock(self):
         now = self._now_dt()
-        self.time_label.configure(text=now.strftime("%H:%M:%S"))
-        self.date_label.configure(text=now.strftime("%d.%m.%Y"))
+        self._view.text(self.time_label, now.strftime("%H:%M:%S"))
+        self._view.text(self.date_label, now.strftime("%d.%m.%Y"))
 
         self._minute_of_silence_tick(now)
+        self._refresh_day_plan(now.date())
         self._update_lesson_or_break(now)
 
-        self.after(250, self._update_clock)
-
-    def _minute_of_silence_tick(self, now_dt: datetime):
-        if self._alarm_priority:
-            return
-
-        if not self.minute_of_silence_enabled:
-            self._mos_active = False
-            self._mos_end_time = None
-            if self.right_mode == "candle" and not self.settings_open:
-                self._show_right("photo")
-            return
-
-        today = now_dt.date()
-
-        if self._mos_active:
-            if self._mos_end_time and now_dt >= self._mos_end_time:
-                self._mos_active = False
-                self._mos_end_time = None
-                if self.right_mode == "candle" and not self.settings_open:
-                    self._show_right("photo")
-            return
-
-        if self._mos_last_date == today:
-            return
-
-        if now_dt.hour == 9 and now_dt.minute == 0 and now_dt.second <= 2:
-            self._mos_last_date = today
-            self._mos_active = True
-
-            if self.right_mode != "candle" and not self.settings_open:
-                self._show_right("candle")
-
-            duration_sec = 60
-            p = self._resolve_path(self.minute_of_silence_sound_path)
-            if p and os.path.exists(p):
-                try:
-                    snd = pygame.mixer.Sound(p)
-                    duration_sec = max(5, int(snd.get_length()) + 1)
-                except Exception:
-                    duration_sec = 60
-
-            self._mos_end_time = now_dt + timedelta(seconds=duration_sec)
-
-            if not self.silent_mode:
-                self._play_sound(self.minute_of_silence_sound_path)
+        # наступний тік — одразу після межі секунди, без дрейфу
+        self.after(1000 - now.microsecond // 1000 + 5, self._update_clock)
 
     def _update_lesson_or_break(self, now_dt: datetime):
         if self._alarm_priority:
-            self.progress.set(0)
-            self.lesson_now_label.configure(text="ТРИВОГА\nГОЛОВНА")
+            self._view.progress(self.progress, 0)
+            self._view.text(self.lesson_now_label, "ТРИВОГА\nГОЛОВНА")
             return
 
         if self._mos_active:
-            self.progress.set(0)
-            self.lesson_now_label.configure(text="ХВИЛИНА\nМОВЧАННЯ")
+            self._view.progress(self.progress, 0)
+            self._view.text(self.lesson_now_label, "ХВИЛИНА\nМОВЧАННЯ")
             return
 
-        lessons = [x for x in self.schedule if is_hhmm(x.get("start", "")) and is_hhmm(x.get("end", ""))]
-        lessons.sort(key=lambda x: hhmm_to_seconds(x["start"]))
-
         now_sec = now_dt.hour * 3600 + now_dt.minute * 60 + now_dt.second
-
-        for it in lessons:
-            s = hhmm_to_seconds(it["start"])
-            e = hhmm_to_seconds(it["end"])
-            if s <= now_sec < e:
-                left = e - now_sec
-                total = max(1, e - s)
-                done = max(0, min(total, now_sec - s))
-                self.progress.set(done / total)
-                self.lesson_now_label.configure(text=f"{it['n']} УРОК\n {seconds_to_hhmmss(left)}")
-                return
-
-        for i in range(len(lessons) - 1):
-            a = lessons[i]
-            b = lessons[i + 1]
-            a_end = hhmm_to_seconds(a["end"])
-            b_start = hhmm_to_seconds(b["start"])
-            if a_end <= now_sec < b_start:
-                left = b_start - now_sec
-                total = max(1, b_start - a_end)
-                done = max(0, min(total, now_sec - a_end))
-                self.progress.set(done / total)
-                self.lesson_now_label.configure(text=f"ПЕРЕРВА\n{seconds_to_hhmmss(left)}")
-                return
-
-        if lessons and now_sec < hhmm_to_seconds(lessons[0]["start"]):
-            left = hhmm_to_seconds(lessons[0]["start"]) - now_sec
-            self.progress.set(0)
-            self.lesson_now_label.configure(text=f"ДО 1 УРОКУ\n{seconds_to_hhmmss(left)}")
+        seg = find_segment(self._segments, now_sec)
+        if seg is None:
+            self._view.progress(self.progress, 0)
+            # за календарем сьогодні розкладу нема — вихідний чи канікули
+            self._view.text(self.lesson_now_label, "КІНЕЦЬ\nУРОКІВ" if self._segments[1] else "ВИХІДНИЙ\nДЕНЬ")
             return
 
-        self.progress.set(0)
-        self.lesson_now_label.configure(text="КІНЕЦЬ\nУРОКІВ")
-
-    def _worker_loop(self):
-        while not self._worker_stop.is_set():
-            now_dt = self._now_dt()
-            hhmm = now_dt.strftime("%H:%M")
-            sec = now_dt.second
-            today = now_dt.date()
-
-            # щоденний ресет антидублю
-            if self._bell_fired_date != today:
-                self._bell_fired_date = today
-                self._bell_fired_keys.clear()
-
-            if self.shutdown_enabled and is_hhmm(self.shutdown_time):
-                if hhmm == self.shutdown_time and sec == 0 and self._shutdown_last_date != today:
-                    self._shutdown_last_date = today
-                    try:
-                        subprocess.Popen(["shutdown", "/s", "/t", "0"], shell=False)
-                    except Exception:
-                        pass
-
-            # ВИПРАВЛЕНО: спрацьовування дзвінків рівно 1 раз на подію
-            if not self._alarm_priority and not self._mos_active and not self.silent_mode:
-                if sec == 0:
-                    for it in self.schedule:
-                        if not (is_hhmm(it.get("start", "")) and is_hhmm(it.get("end", ""))):
-                            continue
-                        n = it.get("n", "?")
-
-                        if hhmm == it["start"]:
-                            key = f"{today}|{hhmm}|start|{n}"
-                            if key not in self._bell_fired_keys:
-                                self._bell_fired_keys.add(key)
-                                # If a custom recording is attached to start, play it, else play default start sound
-                                rec_name = it.get("recording_start", "")
-                                if rec_name and rec_name in self.custom_recordings:
-                                    try:
-                                        threading.Thread(target=self._play_recording, args=(rec_name,), daemon=True).start()
-                                    except Exception:
-                                        pass
-                                else:
-                                    self._play_sound(self.lesson_start_sound_path)
-
-                        if hhmm == it["end"]:
-                            key = f"{today}|{hhmm}|end|{n}"
-                            if key not in self._bell_fired_keys:
-                                self._bell_fired_keys.add(key)
-                                rec_name = it.get("recording_end", "")
-                                if rec_name and rec_name in self.custom_recordings:
-                                    try:
-                                        threading.Thread(target=self._play_recording, args=(rec_name,), daemon=True).start()
-                                    except Exception:
-                                        pass
-                                else:
-                                    self._play_sound(self.lesson_end_sound_path)
-
-            time.sleep(0.20)
+        s, e, prefix, total = seg
+        if total is None:
+            self._view.progress(self.progress, 0)
+        else:
+            self._view.progress(self.progress, max(0, min(total, now_sec - s)) / total)
+        self._view.text(self.lesson_now_label, f"{prefix}{seconds_to_hhmmss(e - now_sec)}")
+
+    def _on_mos_start(self):
+        if self.right_mode != "candle" and not self.settings_open:
+            self._show_right("candle")
+
+    def _on_mos_end(self):
+        if self.right_mode == "candle" and not self.settings_open:
+            self._show_right("photo")
+        self._release_gif()
 
     def _show_alarm_overlay(self):
         if self._alarm_overlay_on:
             return
         self._alarm_overlay_on = True
-        self._alarm_priority = True
-        self._stop_all_non_alarm_audio()
+        self._alarm_on()
         self.alarm_overlay.place(relx=0, rely=0, relwidth=1, relheight=1)
         self.alarm_overlay.lift()
-        self._start_siren()
 
     def _hide_alarm_overlay(self):
         self._alarm_overlay_on = False
-        self._alarm_priority = False
         self.alarm_overlay.place_forget()
-        self._stop_siren()
+        self._alarm_off()
+
+    def _open_alert_map(self):
+        import webbrowser
+        webbrowser.open("https://alerts.in.ua/mini")
 
     def _poll_air_alert(self):
+        """Передає налаштування опитувачу і застосовує отримані статуси (Tk-потік)"""
         try:
             self.ALERTS_TOKEN = self.token_var.get().strip()
-            self.ALERT_UID = safe_int(self.uid_var.get().strip(), self.ALERT_UID)
-
-            if not self.ALERTS_TOKEN or not self.ALERT_UID:
-                self.after(7000, self._poll_air_alert)
-                return
-
-            url = f"https://api.alerts.in.ua/v1/iot/active_air_raid_alerts/{self.ALERT_UID}.json"
-            headers = {"Authorization": f"Bearer {self.ALERTS_TOKEN}"}
-            r = requests.get(url, headers=headers, timeout=6)
-
-            if r.status_code != 200:
-                self.after(7000, self._poll_air_alert)
-                return
-
-            status = r.text.strip().strip('"')
-            if status in ("A", "P"):
-                self._show_alarm_overlay()
-            else:
-                self._hide_alarm_overlay()
+            self._read_alert_uids()
+            self._alert_poller.configure(self.ALERTS_TOKEN, self.ALERT_UIDS)
+
+            regions = self._drain_alert_results()
+            if regions is not None:
+                if alert_active(regions):
+                    self._show_alarm_overlay()
+                else:
+                    self._hide_alarm_overlay()
         except Exception:
             pass
 
-        self.after(7000, self._poll_air_alert)
+        self.after(500, self._poll_air_alert)
+
+    def _read_alert_uids(self):
+        self.ALERT_UIDS = parse_uid_list(self.uid_var.get())
+        self.ALERT_UID = self.ALERT_UIDS[0] if self.ALERT_UIDS else 0
 
     def _enable_test_time(self):
         s = (self.test_time_var.get() or "").strip()
@@ -1524,131 +2056,61 @@ class SchoolBellApp(ctk.CTk):
         target = real.replace(hour=h, minute=m, second=real.second, microsecond=real.microsecond)
         self._time_offset = target - real
         self.test_mode_on = True
+        self._worker_wake.set()
         self._save_config()
         messagebox.showinfo("Ок", f"Тест-час увімкнено: {s}")
 
     def _disable_test_time(self):
         self._time_offset = timedelta(0)
         self.test_mode_on = False
+        self._worker_wake.set()
         self._save_config()
         messagebox.showinfo("Ок", "Тест-час вимкнено.")
 
-    def _load_config(self):
-        if not self.config_path.exists():
-            self._apply_defaults()
-            self._save_config()
-            return
-
-        try:
-            data = json.loads(self.config_path.read_text(encoding="utf-8"))
-        except Exception:
-            self._apply_defaults()
-            self._save_config()
-            return
-
-        def getv(k):
-            return data.get(k, DEFAULTS.get(k))
-
-        self.photo_path = getv("photo_path") or ""
-        if self.photo_path:
-            p = self._resolve_path(self.photo_path)
-            if p and os.path.exists(p):
-                try:
-                    self.photo_img_original = Image.open(p).convert("RGBA")
-                except Exception:
-                    self.photo_img_original = None
-
-        self.lesson_start_sound_path = getv("lesson_start_sound_path") or ""
-        self.lesson_end_sound_path = getv("lesson_end_sound_path") or ""
-        self.siren_sound_path = getv("siren_sound_path") or ""
-        self.minute_of_silence_sound_path = getv("minute_of_silence_sound_path") or ""
-
-        # Load custom recordings
-        self.custom_recordings = getv("custom_recordings") or {}
-
-        self.ALERTS_TOKEN = getv("ALERTS_TOKEN") or ""
-        self.ALERT_UID = safe_int(getv("ALERT_UID"), 0)
-
-        self.minute_of_silence_enabled = bool(getv("minute_of_silence_enabled"))
-        self.candle_gif_path = getv("candle_gif_path") or ""
-        self.silent_mode = bool(getv("silent_mode"))
-
-        self.entry_lock_enabled = bool(getv("entry_lock_enabled"))
-        self.entry_password = getv("entry_password") or ""
-
-        self.shutdown_enabled = bool(getv("shutdown_enabled"))
-        st = getv("shutdown_time") or "00:00"
-        self.shutdown_time = st if is_hhmm(st) else "00:00"
-
-        self.hibernation_enabled = bool(getv("hibernation_enabled"))
-        ht = getv("hibernation_time") or "00:00"
-        self.hibernation_time = ht if is_hhmm(ht) else "00:00"
-
-        self.autostart_enabled = bool(getv("autostart_enabled"))
-
-        sch = data.get("schedule", None)
-        if isinstance(sch, list) and sch:
-            cleaned = []
-            for it in sch:
-                if isinstance(it, dict) and "n" in it and "start" in it and "end" in it:
-                    if is_hhmm(str(it["start"])) and is_hhmm(str(it["end"])):
-                        cleaned.append({"n": int(it["n"]), "start": str(it["start"]), "end": str(it["end"])})
-            self.schedule = cleaned if cleaned else [dict(x) for x in DEFAULT_SCHEDULE_12]
-        else:
-            self.schedule = [dict(x) for x in DEFAULT_SCHEDULE_12]
-
-        self.test_mode_on = bool(getv("test_mode_on"))
-        off = safe_int(getv("test_offset_seconds"), 0)
-        self._time_offset = timedelta(seconds=int(off)) if self.test_mode_on else timedelta(0)
-
-        p = self._resolve_path(self.siren_sound_path)
-        if p and os.path.exists(p):
-            try:
-                self._siren_sound = pygame.mixer.Sound(p)
-                self._siren_sound.set_volume(1.0)
-            except Exception:
-                self._siren_sound = None
-
-        self._load_gif_frames()
+    def _watch_config(self):
+        self._check_config()
+        self.after(CONFIG_WATCH_MS, self._watch_config)
 
-    def _apply_defaults(self):
-        for k, v in DEFAULTS.items():
-            setattr(self, k, v)
-        self.schedule = [dict(x) for x in DEFAULT_SCHEDULE_12]
+    def _apply_config_changes(self, changed: set):
+        """Застосовує лише змінені розділи конфігу, не чіпаючи решту UI"""
+        super()._apply_config_changes(changed)
+        if "schedule" in changed:
+            self._apply_schedule_to_editor()
+        if "custom_recordings" in changed and self.settings_tab == "recordings":
+            self._refresh_recordings_list()
+        if "photo_path" in changed:
+            self._photo_cache_key = None
+            self._schedule_photo_render()
+        if changed & {"slideshow_enabled", "slideshow_dir", "slideshow_interval_seconds", "slideshow_prefetch"}:
+            self._setup_slideshow()
+        if "candle_gif_path" in changed and self.right_mode == "candle":
+            self._start_candle_gif()
+        if changed & {"ALERTS_TOKEN", "ALERT_UIDS"}:
+            self.token_var.set(self.ALERTS_TOKEN)
+            self.uid_var.set(", ".join(str(u) for u in self.ALERT_UIDS))
+
+        for key, var in (
+            ("silent_mode", self.silent_var),
+            ("minute_of_silence_enabled", self.mos_var),
+            ("entry_lock_enabled", self.entry_lock_var),
+            ("shutdown_enabled", self.shutdown_var),
+            ("hibernation_enabled", self.hibernation_var),
+            ("autostart_enabled", self.autostart_var),
+            ("slideshow_enabled", self.slideshow_var),
+        ):
+            if key in changed:
+                var.set(getattr(self, key))
+        self._refresh_sound_button_titles()
 
     def _save_config(self):
         try:
             if hasattr(self, "token_var"):
                 self.ALERTS_TOKEN = self.token_var.get().strip()
             if hasattr(self, "uid_var"):
-                self.ALERT_UID = safe_int(self.uid_var.get().strip(), self.ALERT_UID)
-
-            data = {
-                "photo_path": self.photo_path,
-                "lesson_start_sound_path": self.lesson_start_sound_path,
-                "lesson_end_sound_path": self.lesson_end_sound_path,
-                "siren_sound_path": self.siren_sound_path,
-                "minute_of_silence_sound_path": self.minute_of_silence_sound_path,
-                "ALERTS_TOKEN": self.ALERTS_TOKEN,
-                "ALERT_UID": self.ALERT_UID,
-                "minute_of_silence_enabled": self.minute_of_silence_enabled,
-                "candle_gif_path": self.candle_gif_path,
-                "silent_mode": self.silent_mode,
-                "test_mode_on": self.test_mode_on,
-                "test_offset_seconds": int(self._time_offset.total_seconds()),
-                "entry_lock_enabled": self.entry_lock_enabled,
-                "entry_password": self.entry_password,
-                "shutdown_enabled": self.shutdown_enabled,
-                "shutdown_time": self.shutdown_time,
-                "hibernation_enabled": self.hibernation_enabled,
-                "hibernation_time": self.hibernation_time,
-                "autostart_enabled": self.autostart_enabled,
-                "schedule": self.schedule,
-                "custom_recordings": self.custom_recordings,
-            }
-            self.config_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+                self._read_alert_uids()
         except Exception:
             pass
+        super()._save_config()
 
         if hasattr(self, "btn_pick_start"):
             self._refresh_sound_button_titles()
@@ -1660,106 +2122,110 @@ class SchoolBellApp(ctk.CTk):
         return rec_dir
     
     def _start_recording(self):
-        """Запускає запис звуку"""
-        self.is_recording = True
-        self.record_data = []
-        self.record_start_time = time.time()
-        
-        def record_thread():
-            try:
-                sr = 44100
-                duration = 60  # Макс 60 секунд
-                recording = sd.rec(int(sr * duration), samplerate=sr, channels=1, dtype=np.int16)
-                sd.wait()
-                self.record_data = recording
-            except Exception as e:
-                messagebox.showerror("Помилка запису", f"Помилка при записі: {e}")
-            finally:
-                self.is_recording = False
-        
-        thread = threading.Thread(target=record_thread, daemon=True)
-        thread.start()
-    
+        """Запускає потоковий запис звуку"""
+        if self._recorder is not None:
+            self._recorder.discard()
+        self._recorder = StreamRecorder(
+            self._get_recordings_dir() / ".recording.tmp.wav",
+            max_seconds=self.recording_max_seconds,
+        )
+        try:
+            self._recorder.start()
+            self.is_recording = True
+        except Exception as e:
+            self._recorder.discard()
+            self._recorder = None
+            self.is_recording = False
+            messagebox.showerror("Помилка запису", f"Помилка при записі: {e}")
+
     def _stop_recording(self):
         """Зупиняє запис звуку"""
-        try:
-            sd.stop()
-        except Exception:
-            pass
-    
+        self.is_recording = False
+        if self._recorder is not None:
+            self._recorder.stop()
+
     def _save_recording(self, name: str):
-        """Зберігає запис звуку"""
-        if not self.record_data or len(self.record_data) == 0:
+        """Зберігає запис звуку без тиші на початку і в кінці"""
+        rec = self._recorder
+        if rec is None or rec.frames == 0:
             messagebox.showwarning("Помилка", "Нема записованого звуку!")
             return False
-        
+
         try:
             rec_dir = self._get_recordings_dir()
             filename = f"{name}.wav"
             filepath = rec_dir / filename
-            
-            sr = 44100
-            wavfile.write(str(filepath), sr, self.record_data.astype(np.int16))
-            
+
+            if not rec.save(filepath):
+                messagebox.showwarning("Помилка", "Нема записованого звуку!")
+                return False
+
             self.custom_recordings[name] = {
                 "path": str(filepath),
                 "created": datetime.now().isoformat(),
                 "used_in_schedule": []
             }
+            self._rec_index.add(name)
+            self._rec_thumbs.pop(name, None)
             self._save_config()
+            self._preload_sounds()
             messagebox.showinfo("Успіх", f"Запис '{name}' збережено!")
             return True
         except Exception as e:
             messagebox.showerror("Помилка", f"Помилка при збережені: {e}")
             return False
-    
-    def _play_recording(self, name: str):
-        """Відтворює записаний звук"""
-        try:
-            if name not in self.custom_recordings:
-                messagebox.showerror("Помилка", "Запис не знайдено!")
-                return
-            
-            filepath = self.custom_recordings[name]["path"]
-            if not os.path.exists(filepath):
-                messagebox.showerror("Помилка", "Файл запису не знайдено!")
-                return
-            
-            sr, data = wavfile.read(filepath)
-            sd.play(data, sr)
-            sd.wait()
-        except Exception as e:
-            messagebox.showerror("Помилка при відтворенні", str(e))
-    
+        finally:
+            rec.discard()
+            self._recorder = None
+
+    def _on_recording_missing(self, name: str, priority: int):
+        # з воркера дзвінків діалоги не показуємо
+        if priority == AudioEngine.PREVIEW:
+            messagebox.showerror("Помилка", "Файл запису не знайдено!")
+
     def _delete_recording(self, name: str):
-        """Видаляє запис"""
+        """Видаляє запис і знімає його прив'язки в розкладі"""
         try:
-            if name not in self.custom_recordings:
+            if not super()._delete_recording(name):
                 return False
-            
-            filepath = self.custom_recordings[name]["path"]
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            
-            del self.custom_recordings[name]
-            self._save_config()
-            return True
         except Exception as e:
             messagebox.showerror("Помилка", f"Помилка при видаленні: {e}")
             return False
-    
+        self._rec_index.remove(name)
+        self._rec_thumbs.pop(name, None)
+        self._editor_retarget(name, "")
+        return True
+
     def _rename_recording(self, old_name: str, new_name: str):
-        """Перейменовує запис"""
+        """Перейменовує запис разом з прив'язками в розкладі"""
+        if new_name in self.custom_recordings:
+            messagebox.showwarning("Перейменування", f"Запис '{new_name}' вже є.")
+            return False
         try:
-            if old_name not in self.custom_recordings:
+            if not super()._rename_recording(old_name, new_name):
                 return False
-            
-            self.custom_recordings[new_name] = self.custom_recordings.pop(old_name)
-            self._save_config()
-            return True
         except Exception as e:
             messagebox.showerror("Помилка", f"Помилка при перейменуванні: {e}")
             return False
+        self._rec_index.rename(old_name, new_name)
+        self._rec_thumbs.pop(old_name, None)
+        self._editor_retarget(old_name, new_name)
+        return True
+
+    def _editor_retarget(self, old: str, new: str):
+        """Те саме перейменування/зняття прив'язки в ще не застосованих рядках редактора"""
+        self._flush_editor_writes()
+        changed = False
+        for item in self._editor_rows:
+            for key in ("recording_start", "recording_end"):
+                if item.get(key) == old:
+                    if new:
+                        item[key] = new
+                    else:
+                        del item[key]
+                    changed = True
+        if changed:
+            self._editor_changed()
 
     def _build_recordings_panel(self):
         """Будує панель для управління записами"""
@@ -1781,63 +2247,210 @@ class SchoolBellApp(ctk.CTk):
         self.btn_stop_rec = ctk.CTkButton(btn_frame, text="⏹ Зберегти запис", command=self._stop_rec_window, state="disabled")
         self.btn_stop_rec.grid(row=0, column=1, padx=(5, 0), pady=10, sticky="ew")
         
+        self.rec_search_var = ctk.StringVar(value="")
+        self.rec_search_var.trace_add("write", lambda *a: self._schedule_recordings_filter())
+        search_row = ctk.CTkFrame(p, corner_radius=12)
+        search_row.grid(row=2, column=0, columnspan=2, padx=12, pady=(0, 10), sticky="ew")
+        search_row.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(search_row, text="Пошук").grid(row=0, column=0, padx=10, pady=10, sticky="w")
+        ctk.CTkEntry(search_row, textvariable=self.rec_search_var).grid(row=0, column=1, padx=(0, 10), pady=10, sticky="ew")
+
         # Список записів
         self.recordings_list_frame = ctk.CTkFrame(p, corner_radius=12)
-        self.recordings_list_frame.grid(row=2, column=0, columnspan=2, padx=12, pady=(0, 18), sticky="nsew")
+        self.recordings_list_frame.grid(row=3, column=0, columnspan=2, padx=12, pady=(0, 18), sticky="nsew")
         self.recordings_list_frame.grid_columnconfigure(0, weight=1)
         self.recordings_list_frame.grid_rowconfigure(0, weight=1)
-        
-        self.recordings_list = ctk.CTkScrollableFrame(self.recordings_list_frame, corner_radius=12)
+
+        self.recordings_list = ctk.CTkFrame(self.recordings_list_frame, corner_radius=12, fg_color="transparent")
         self.recordings_list.grid(row=0, column=0, sticky="nsew")
         self.recordings_list.grid_columnconfigure(0, weight=1)
-        
-        self._refresh_recordings_list()
-    
+        self.recordings_scroll = ctk.CTkScrollbar(self.recordings_list_frame, command=self._rec_yview)
+        self.recordings_scroll.grid(row=0, column=1, sticky="ns", padx=(0, 4), pady=6)
+        self.recordings_empty = ctk.CTkLabel(self.recordings_list, text="Нема записів", text_color="gray")
+
+        for w in (self.recordings_list, self.recordings_scroll):
+            w.bind("<MouseWheel>", self._rec_wheel)
+            w.bind("<Button-4>", self._rec_wheel)
+            w.bind("<Button-5>", self._rec_wheel)
+
+    def _build_recording_slots(self):
+        """Фіксований набір рядків списку записів; записи лише прив'язуються до них"""
+        for k in range(RECORDINGS_VISIBLE_ROWS):
+            item_frame = ctk.CTkFrame(self.recordings_list, corner_radius=10)
+            item_frame.grid(row=k, column=0, sticky="ew", padx=10, pady=5)
+            item_frame.grid_columnconfigure(1, weight=1)
+
+            # Іконка запису
+            icon_label = ctk.CTkLabel(item_frame, text="🎙", font=self._font(16))
+            icon_label.grid(row=0, column=0, padx=10, pady=10)
+
+            # Назва запису і її метадані з бібліотеки
+            text_box = ctk.CTkFrame(item_frame, fg_color="transparent")
+            text_box.grid(row=0, column=1, padx=(0, 10), pady=6, sticky="ew")
+            name_label = ctk.CTkLabel(text_box, text="", font=self._font(14), anchor="w")
+            name_label.grid(row=0, column=0, sticky="w")
+            meta_label = ctk.CTkLabel(text_box, text="", font=self._font(11), text_color="gray", anchor="w")
+            meta_label.grid(row=1, column=0, sticky="w")
+
+            wave_label = ctk.CTkLabel(item_frame, text="")
+            wave_label.grid(row=0, column=5, padx=(6, 10), pady=10)
+
+            # Кнопки дій
+            play_btn = ctk.CTkButton(item_frame, text="▶", width=40, command=lambda k=k: self._recording_slot_action(k, self._play_recording))
+            play_btn.grid(row=0, column=2, padx=2, pady=10)
+
+            rename_btn = ctk.CTkButton(item_frame, text="✏", width=40, command=lambda k=k: self._recording_slot_action(k, self._show_rename_dialog))
+            rename_btn.grid(row=0, column=3, padx=2, pady=10)
+
+            delete_btn = ctk.CTkButton(item_frame, text="🗑", width=40, fg_color="#8b2b2b", hover_color="#a43737",
+                                      command=lambda k=k: self._recording_slot_action(k, self._delete_recording_with_refresh))
+            delete_btn.grid(row=0, column=4, padx=2, pady=10)
+
+            for w in (item_frame, icon_label, text_box, name_label, meta_label, wave_label):
+                w.bind("<MouseWheel>", self._rec_wheel)
+                w.bind("<Button-4>", self._rec_wheel)
+                w.bind("<Button-5>", self._rec_wheel)
+
+            self._rec_slots.append((item_frame, name_label, meta_label, wave_label))
+
     def _refresh_recordings_list(self):
-        """Оновлює список записів"""
-        for widget in self.recordings_list.winfo_children():
-            widget.destroy()
-        
-        if not self.custom_recordings:
-            empty_label = ctk.CTkLabel(self.recordings_list, text="Нема записів", text_color="gray")
-            empty_label.pack(padx=10, pady=20)
+        """Звіряє індекс назв і бібліотеку з custom_recordings і перемальовує видиму частину списку"""
+        self._rec_index.sync(self.custom_recordings.keys())
+        self._library.prune(self.custom_recordings.keys())
+        self._render_recordings()
+
+    def _render_recordings(self):
+        """Показує відфільтровані записи в рядках-віджетах.
+
+        Нічого не робить, якщо не змінилися ні індекс, ні пошук, ні прокрутка;
+        інакше передає в Tk лише назви, що відрізняються від показаних.
+        """
+        if self.settings_tab != "recordings":
             return
-        
-        for name in self.custom_recordings.keys():
-            self._add_recording_item(name)
-    
-    def _add_recording_item(self, name: str):
-        """Додає запис до списку"""
-        item_frame = ctk.CTkFrame(self.recordings_list, corner_radius=10)
-        item_frame.pack(fill="x", padx=10, pady=5)
-        item_frame.grid_columnconfigure(1, weight=1)
-        
-        # Іконка запису
-        icon_label = ctk.CTkLabel(item_frame, text="🎙", font=ctk.CTkFont(size=16))
-        icon_label.grid(row=0, column=0, padx=10, pady=10)
-        
-        # Назва запису
-        name_label = ctk.CTkLabel(item_frame, text=name, font=ctk.CTkFont(size=14))
-        name_label.grid(row=0, column=1, padx=(0, 10), pady=10, sticky="w")
-        
-        # Кнопки дій
-        play_btn = ctk.CTkButton(item_frame, text="▶", width=40, command=lambda: self._play_recording(name))
-        play_btn.grid(row=0, column=2, padx=2, pady=10)
-        
-        rename_btn = ctk.CTkButton(item_frame, text="✏", width=40, command=lambda: self._show_rename_dialog(name))
-        rename_btn.grid(row=0, column=3, padx=2, pady=10)
-        
-        delete_btn = ctk.CTkButton(item_frame, text="🗑", width=40, fg_color="#8b2b2b", hover_color="#a43737", 
-                                  command=lambda: self._delete_recording_with_refresh(name))
-        delete_btn.grid(row=0, column=4, padx=2, pady=10)
-    
+        if not self._rec_slots:
+            self._build_recording_slots()
+
+        query = self.rec_search_var.get()
+        if self._rec_shown is None or self._rec_shown[:2] != (self._rec_index.version, query):
+            self._rec_names = self._rec_index.search(query)
+        names = self._rec_names
+        self._rec_top = max(0, min(self._rec_top, len(names) - RECORDINGS_VISIBLE_ROWS))
+        state = (self._rec_index.version, query, self._rec_top, self._recording_usage_version)
+        if state == self._rec_shown:
+            return
+        self._rec_shown = state
+
+        for k, (frame, name_label, meta_label, wave_label) in enumerate(self._rec_slots):
+            idx = self._rec_top + k
+            if idx < len(names):
+                frame.grid()
+                self._view.text(name_label, names[idx])
+                self._bind_recording_meta(names[idx], meta_label, wave_label)
+            else:
+                frame.grid_remove()
+        self._library.save()
+
+        if names:
+            self.recordings_empty.grid_remove()
+        else:
+            self._view.text(self.recordings_empty, "Нічого не знайдено" if len(self._rec_index) else "Нема записів")
+            self.recordings_empty.grid(row=0, column=0, padx=10, pady=20)
+
+        total = max(1, len(names))
+        self.recordings_scroll.set(self._rec_top / total, min(1.0, (self._rec_top + RECORDINGS_VISIBLE_ROWS) / total))
+
+    def _bind_recording_meta(self, name: str, meta_label, wave_label):
+        """Тривалість, рівні, використання в розкладі і мініатюра хвилі для рядка списку.
+
+        Якщо метаданих ще нема, файл аналізується у фоновому пулі, а рядок
+        поки показує заглушку; готовий результат забирає _on_image_ready.
+        """
+        rec = self.custom_recordings.get(name) or {}
+        path = rec.get("path", "")
+        stamp = RecordingLibrary.stamp_of(path) if path else None
+        item = self._library.fresh(name, path, stamp) if stamp else None
+        uses = len(self._recording_usage.get(name, ()))
+        if stamp is None:
+            text = "файл не знайдено"
+        elif item is None:
+            text = f"аналіз… · у розкладі: {uses}"
+            self._images.request(("rec", name, path, tuple(stamp)), job=lambda: RecordingLibrary.build(path), cache=False)
+            self._schedule_images_drain()
+        elif "duration" not in item:
+            text = f"не WAV · у розкладі: {uses}"
+        else:
+            d = int(round(item["duration"]))
+            text = (f"{d // 60}:{d % 60:02d} · пік {format_level(item['peak'])} дБ"
+                    f" · RMS {format_level(item['rms'])} дБ · у розкладі: {uses}")
+        self._view.text(meta_label, text)
+
+        stamp = tuple(item["stamp"]) if item else None
+        cached = self._rec_thumbs.get(name)
+        if cached is None or cached[0] != stamp:
+            img = make_wave_thumb(item.get("wave", []) if item else [])
+            cached = (stamp, ctk.CTkImage(light_image=img, dark_image=img, size=img.size))
+            self._rec_thumbs[name] = cached
+        if getattr(wave_label, "_thumb", None) is not cached[1]:
+            wave_label._thumb = cached[1]
+            wave_label.configure(image=cached[1])
+
+    def _on_recording_meta_ready(self, key, item):
+        """Кладе фоновий аналіз запису в бібліотеку і один раз перемальовує видимі рядки"""
+        _, name, path, _ = key
+        rec = self.custom_recordings.get(name)
+        if item is None or rec is None or rec.get("path") != path:
+            return
+        self._library.store(name, item)
+        if self._rec_meta_job is None:
+            self._rec_meta_job = self.after_idle(self._rerender_recordings)
+
+    def _rerender_recordings(self):
+        self._rec_meta_job = None
+        self._rec_shown = None
+        self._render_recordings()
+
+    def _schedule_recordings_filter(self):
+        """Пошук застосовується один раз після серії натискань"""
+        if self._rec_filter_job is None:
+            self._rec_filter_job = self.after_idle(self._apply_recordings_filter)
+
+    def _apply_recordings_filter(self):
+        self._rec_filter_job = None
+        self._rec_top = 0
+        self._render_recordings()
+
+    def _recording_slot_action(self, k: int, action):
+        idx = self._rec_top + k
+        if idx < len(self._rec_names):
+            action(self._rec_names[idx])
+
+    def _rec_scroll_to(self, top: int):
+        top = max(0, min(int(top), len(self._rec_names) - RECORDINGS_VISIBLE_ROWS))
+        if top != self._rec_top:
+            self._rec_top = top
+            self._render_recordings()
+
+    def _rec_yview(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._rec_scroll_to(round(float(args[1]) * len(self._rec_names)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (RECORDINGS_VISIBLE_ROWS if args[2] == "pages" else 1)
+            self._rec_scroll_to(self._rec_top + step)
+
+    def _rec_wheel(self, event):
+        self._rec_scroll_to(self._rec_top + self._wheel_step(event))
+        return "break"
+
     def _start_rec_window(self):
         """Відкриває вікно для запису"""
         self._stop_recording()
-        self.is_recording = True
+        self._start_recording()
+        if not self.is_recording:
+            return
         self.btn_start_rec.configure(state="disabled")
         self.btn_stop_rec.configure(state="normal")
-        self._start_recording()
         messagebox.showinfo("Запис", "Запис розпочато! Говори в мікрофон.")
     
     def _stop_rec_window(self):
@@ -1849,31 +2462,35 @@ class SchoolBellApp(ctk.CTk):
         name = simpledialog.askstring("Назва запису", "Введи назву для цього запису:")
         if name and name.strip():
             if self._save_recording(name.strip()):
-                self._refresh_recordings_list()
+                self._render_recordings()
+        elif self._recorder is not None:
+            self._recorder.discard()
+            self._recorder = None
     
     def _show_rename_dialog(self, old_name: str):
         """Показує діалог перейменування"""
         new_name = simpledialog.askstring("Перейменувати", f"Нова назва для '{old_name}':", initialvalue=old_name)
         if new_name and new_name.strip() and new_name != old_name:
             if self._rename_recording(old_name, new_name.strip()):
-                self._refresh_recordings_list()
+                self._render_recordings()
     
     def _delete_recording_with_refresh(self, name: str):
         """Видаляє запис з оновленням списку"""
-        if messagebox.askyesno("Видалення", f"Видалити запис '{name}'?"):
+        uses = len(self._recording_usage.get(name, ()))
+        question = f"Видалити запис '{name}'?"
+        if uses:
+            question += f"\n\nВін прикріплений до {uses} дзвінків у розкладі; там знову лунатиме типовий звук."
+        if messagebox.askyesno("Видалення", question):
             if self._delete_recording(name):
-                self._refresh_recordings_list()
+                self._render_recordings()
 
     def on_close(self):
-        self._worker_stop.set()
-        self._worker_stop.set()
-        try:
-            pygame.mixer.music.stop()
-        except Exception:
-            pass
-        self._stop_siren()
+        self._stop_core()
         self._stop_candle_gif()
+        self._images.shutdown()
         self._save_config()
+        self._config_store.flush()
+        self._library.flush()
         self.destroy()
 
 
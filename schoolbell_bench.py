@@ -0,0 +1,244 @@
+"""
+Бенчмарки гарячих шляхів шкільного дзвінка. Дисплей не потрібен.
+
+    python schoolbell_bench.py                          # прогін і таблиця
+    python schoolbell_bench.py --save bench_baseline.json
+    python schoolbell_bench.py --baseline bench_baseline.json --tolerance 0.25
+
+Для кожного випадку: ops/sec, p50/p99 затримки однієї операції і пікова
+пам'ять однієї операції за tracemalloc (лише Python-алокації, буфери
+пікселів PIL туди не потрапляють). З --baseline порівнює з
+збереженим прогоном і повертає код 1, якщо щось стало повільнішим.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+import schoolbell_core
+from schoolbell_core import BellCore
+
+RESOLUTIONS = ((1280, 720), (1920, 1080), (2560, 1440), (3840, 2160))
+SCHEDULE_SIZES = (12, 100, 1000)
+
+
+def load_app_module():
+    """Імпортує 1212.py (ім'я файлу не є ідентифікатором Python)"""
+    path = Path(__file__).resolve().parent / "1212.py"
+    spec = importlib.util.spec_from_file_location("schoolbell_app", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_schedule(count: int) -> list:
+    """count уроків, рівномірно розкладених по добі (з точністю до хвилини)"""
+    step = 86400 // count
+    rows = []
+    for i in range(count):
+        start = i * step // 60
+        end = min(start + max(1, step // 120), 1439)
+        rows.append({
+            "n": i + 1,
+            "start": f"{start // 60:02d}:{start % 60:02d}",
+            "end": f"{end // 60:02d}:{end % 60:02d}",
+        })
+    return rows
+
+
+class BenchCore(BellCore):
+    """Ядро без звуку і мережі: дзвінок лише рахується"""
+
+    def __init__(self, base_dir: Path):
+        self._init_core(base_dir)
+        self.fired = 0
+
+    def _fire_bell(self, kind: str, rec_name: str):
+        self.fired += 1
+
+
+class SimClock:
+    """Модуль time для ядра, де monotonic іде разом із симульованим годинником"""
+
+    def __init__(self):
+        self.mono = 0.0
+
+    def monotonic(self):
+        return self.mono
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class _Widget:
+    def configure(self, **kwargs):
+        pass
+
+    def set(self, value):
+        pass
+
+
+def measure(fn, min_time: float = 0.5, min_ops: int = 5, max_ops: int = 200000) -> dict:
+    fn()
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < max_ops and (len(times) < min_ops or time.perf_counter() < deadline):
+        t = time.perf_counter_ns()
+        fn()
+        times.append(time.perf_counter_ns() - t)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    total = sum(times)
+    return {
+        "ops": len(times),
+        "ops_per_sec": round(len(times) / (total / 1e9), 2) if total else 0.0,
+        "p50_us": round(times[len(times) // 2] / 1000, 2),
+        "p99_us": round(times[min(len(times) - 1, int(len(times) * 0.99))] / 1000, 2),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def build_cases(app, work: Path) -> list:
+    """(назва, функція однієї операції) для всіх випадків"""
+    cases = []
+    day = datetime(2024, 9, 2)
+    sim_clock = SimClock()
+    schoolbell_core.time = sim_clock
+
+    for count in SCHEDULE_SIZES:
+        core = BenchCore(work)
+        core._set_schedule(make_schedule(count))
+        state = {"i": 0}
+        sim = {"t": 0.0}
+
+        def tick(core=core, sim=sim):
+            # як справжній воркер: прокидаємось на наступному дедлайні, а
+            # годинник і monotonic ідуть разом, тож це звичайний прохід без стрибка часу
+            sim_clock.mono = sim["t"]
+            sim["t"] += core._worker_tick(day + timedelta(seconds=sim["t"]))
+
+        cases.append((f"worker_tick[{count}]", tick))
+
+        ui = SimpleNamespace(
+            _alarm_priority=False,
+            _mos_active=False,
+            _segments=core._segments,
+            _view=app.WidgetView(),
+            progress=_Widget(),
+            lesson_now_label=_Widget(),
+        )
+
+        def clock(ui=ui, state=state):
+            state["i"] = (state["i"] + 1) % 86400
+            app.SchoolBellApp._update_lesson_or_break(ui, day + timedelta(seconds=state["i"]))
+
+        cases.append((f"update_lesson[{count}]", clock))
+
+    for w, h in RESOLUTIONS:
+        cases.append((f"make_blue_bg[{w}x{h}]", lambda w=w, h=h: app.make_blue_bg(w, h)))
+
+    photo = work / "photo.jpg"
+    Image.radial_gradient("L").resize((6000, 4000)).convert("RGB").save(photo, quality=90)
+    for w, h in RESOLUTIONS:
+        cases.append((f"photo_fit[{w}x{h}]", lambda w=w, h=h: app.load_fitted_image(str(photo), (w, h))))
+
+    gif = work / "candle.gif"
+    frames = [Image.linear_gradient("L").rotate(i * 18).resize((480, 480)).convert("P") for i in range(20)]
+    frames[0].save(gif, save_all=True, append_images=frames[1:], duration=80, loop=0)
+    cache = app.ScaledFrameCache(lambda im: im)
+    cache.set_source(app.GifSource(str(gif)))
+    gif_state = {"i": 0}
+
+    def gif_frame():
+        gif_state["i"] += 1
+        cache.reset()
+        cache.get(gif_state["i"], (1080, 1080))
+
+    cases.append(("gif_frame_scale[1080]", gif_frame))
+
+    cfg = BenchCore(work)
+    cfg._set_schedule(make_schedule(12))
+    cfg.test_mode_on = True
+
+    def config_round_trip():
+        # інакше однаковий вміст не пишеться і вимірюється лише json.dumps
+        cfg._time_offset += timedelta(seconds=1)
+        cfg._save_config()
+        cfg._config_store.flush()
+        cfg._load_config()
+
+    cases.append(("config_round_trip", config_round_trip))
+    return cases
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Назви випадків, у яких p50 або пік пам'яті гірші за базу більш ніж на tolerance"""
+    worse = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if res["p50_us"] > base["p50_us"] * (1 + tolerance) or res["peak_kb"] > base["peak_kb"] * (1 + tolerance) + 64:
+            worse.append(name)
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки шкільного дзвінка")
+    parser.add_argument("--filter", default="", help="запускати лише випадки, що містять цей рядок")
+    parser.add_argument("--min-time", type=float, default=0.5, help="мінімальний час на випадок, с")
+    parser.add_argument("--save", help="зберегти результати як базу (JSON)")
+    parser.add_argument("--baseline", help="порівняти з базою (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="допустиме погіршення, частка")
+    args = parser.parse_args()
+
+    app = load_app_module()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in build_cases(app, Path(tmp)):
+            if args.filter and args.filter not in name:
+                continue
+            res = measure(fn, min_time=args.min_time)
+            results[name] = res
+            base = baseline.get(name)
+            delta = f"{(res['p50_us'] / base['p50_us'] - 1) * 100:+7.1f}%" if base and base["p50_us"] else ""
+            print(f"{name:<24} {res['ops_per_sec']:>12.1f} op/s  p50 {res['p50_us']:>10.1f} us"
+                  f"  p99 {res['p99_us']:>10.1f} us  peak {res['peak_kb']:>9.1f} KB  {delta}", flush=True)
+
+    if args.save:
+        meta = {"date": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+                "platform": sys.platform, "cpus": os.cpu_count()}
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+
+    if baseline:
+        worse = compare(results, baseline, args.tolerance)
+        if worse:
+            print("Погіршення відносно бази: " + ", ".join(worse))
+            return 1
+        print("Без погіршень відносно бази.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
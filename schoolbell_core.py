@@ -0,0 +1,1649 @@
+"""
+Ядро шкільного дзвінка без GUI: розклад, звук, тривоги, конфіг.
+
+Використовується і вікном (1212.py), і фоновим демоном (schoolbell_daemon.py),
+тому тут не можна імпортувати customtkinter, tkinter чи PIL.
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import wave
+import queue
+import random
+import threading
+import subprocess
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from pathlib import Path
+from datetime import date, datetime, timedelta, time as dt_time
+
+
+APP_NAME = "SchoolBell"
+CONFIG_NAME = "config.json"
+CONFIG_WATCH_MS = 2000
+STARTUP_LOG_NAME = "startup_times.jsonl"
+RECORDINGS_DIR_NAME = "recordings"
+LIBRARY_NAME = "library.json"
+WAVE_POINTS = 64
+
+
+DEFAULTS = {
+    "photo_path": "",
+
+    "lesson_start_sound_path": "",
+    "lesson_end_sound_path": "",
+    "siren_sound_path": "",
+    "minute_of_silence_sound_path": "",
+
+    "ALERTS_TOKEN": "",
+    "ALERT_UID": 0,
+    "ALERT_UIDS": [],
+
+    "minute_of_silence_enabled": True,
+    "candle_gif_path": "",
+
+    "silent_mode": False,
+
+    "test_mode_on": False,
+    "test_offset_seconds": 0,
+
+    "entry_lock_enabled": False,
+    "entry_password": "",
+
+    "shutdown_enabled": False,
+    "shutdown_time": "00:00",
+
+    "recording_max_seconds": 60,
+    "bell_grace_seconds": 60,
+
+    # календар розкладів: профіль на кожен день тижня (пн..нд), разові
+    # зміни на дату і діапазони канікул; "main" — основний розклад, "" — без дзвінків
+    "schedule_profiles": {},
+    "schedule_weekdays": ["main"] * 7,
+    "schedule_overrides": {},
+    "schedule_holidays": [],
+
+    "slideshow_enabled": False,
+    "slideshow_dir": "",
+    "slideshow_interval_seconds": 15,
+    "slideshow_prefetch": 3,
+}
+
+
+DEFAULT_SCHEDULE_12 = [
+    {"n": 1,  "start": "08:00", "end": "08:40"},
+    {"n": 2,  "start": "08:45", "end": "09:25"},
+    {"n": 3,  "start": "09:35", "end": "10:15"},
+    {"n": 4,  "start": "10:20", "end": "11:00"},
+    {"n": 5,  "start": "11:10", "end": "11:50"},
+    {"n": 6,  "start": "12:00", "end": "12:40"},
+    {"n": 7,  "start": "12:45", "end": "13:25"},
+    {"n": 8,  "start": "13:35", "end": "14:15"},
+    {"n": 9,  "start": "14:25", "end": "15:05"},
+    {"n": 10, "start": "15:10", "end": "15:50"},
+    {"n": 11, "start": "15:55", "end": "16:35"},
+    {"n": 12, "start": "16:40", "end": "17:20"},
+]
+
+
+def app_dir() -> Path:
+    p = Path(sys.argv[0]).resolve() if sys.argv and sys.argv[0] else Path.cwd()
+    return p.parent if p.suffix else Path.cwd()
+
+
+def now_local():
+    return datetime.now()
+
+
+def safe_int(x, default=0):
+    try:
+        return int(x)
+    except Exception:
+        return default
+
+
+def is_hhmm(s: str) -> bool:
+    try:
+        hh, mm = s.split(":")
+        hh = int(hh)
+        mm = int(mm)
+        return 0 <= hh <= 23 and 0 <= mm <= 59
+    except Exception:
+        return False
+
+
+def hhmm_to_seconds(s: str) -> int:
+    hh, mm = s.split(":")
+    return int(hh) * 3600 + int(mm) * 60
+
+
+def seconds_to_hhmmss(total: int) -> str:
+    total = max(0, int(total))
+    mm = total // 60
+    ss = total % 60
+    return f"{mm:02d}:{ss:02d}"
+
+
+# Максимальний сон воркера між подіями: страховка від зміни системного часу
+WORKER_MAX_SLEEP = 60.0
+# розбіжність годинника і monotonic між проходами, яку вважаємо стрибком часу
+CLOCK_STEP_TOLERANCE = 2.0
+
+
+def parse_uid_list(text) -> list:
+    """Розбирає список UID регіонів: "31, 1293" або [31, 1293]"""
+    if isinstance(text, (list, tuple)):
+        parts = text
+    else:
+        parts = str(text or "").replace(";", ",").replace(" ", ",").split(",")
+    result = []
+    for part in parts:
+        uid = safe_int(str(part).strip(), 0)
+        if uid > 0 and uid not in result:
+            result.append(uid)
+    return result
+
+
+def evaluate_alert_regions(statuses: str, uids) -> dict:
+    """Статус кожного регіону зі зведеного рядка API (символ на позиції UID)"""
+    return {uid: (statuses[uid] if 0 <= uid < len(statuses) else "N") for uid in uids}
+
+
+def alert_active(regions: dict) -> bool:
+    """Тривога (A) або часткова тривога (P) хоча б в одному регіоні"""
+    return any(st in ("A", "P") for st in regions.values())
+
+
+def seconds_of_day(dt: datetime) -> float:
+    return dt.hour * 3600 + dt.minute * 60 + dt.second + dt.microsecond / 1_000_000
+
+
+def compile_timeline(schedule: list) -> tuple:
+    """Компілює розклад у відсортований таймлайн подій.
+
+    Повертає (secs, events), де events — список кортежів
+    (секунда доби, "start"/"end", n уроку, назва запису), а secs — їхні секунди
+    для bisect.
+    """
+    events = []
+    for it in schedule:
+        start = str(it.get("start", ""))
+        end = str(it.get("end", ""))
+        if not (is_hhmm(start) and is_hhmm(end)):
+            continue
+        n = it.get("n", "?")
+        events.append((hhmm_to_seconds(start), "start", n, it.get("recording_start", "") or ""))
+        events.append((hhmm_to_seconds(end), "end", n, it.get("recording_end", "") or ""))
+    events.sort(key=lambda ev: ev[0])
+    return [ev[0] for ev in events], events
+
+
+def compile_segments(schedule: list) -> tuple:
+    """Компілює розклад у відсортовані відрізки уроків і перерв.
+
+    Кожен відрізок — (початок, кінець, префікс підпису, знаменник прогресу);
+    знаменник None означає відрізок без прогресу ("ДО 1 УРОКУ"). Уроки
+    другої і наступних змін підписуються номером зміни. Повертає
+    (початки, відрізки, найпізніший кінець серед відрізків 0..i).
+    """
+    lessons = []
+    for it in schedule:
+        start = str(it.get("start", ""))
+        end = str(it.get("end", ""))
+        if is_hhmm(start) and is_hhmm(end):
+            lessons.append((hhmm_to_seconds(start), hhmm_to_seconds(end), it.get("n", "?"), it.get("shift", 1)))
+    lessons.sort(key=lambda x: x[0])
+
+    segments = []
+    if lessons and lessons[0][0] > 0:
+        segments.append((0, lessons[0][0], "ДО 1 УРОКУ\n", None))
+    busy = 0
+    for i, (s, e, n, shift) in enumerate(lessons):
+        title = f"{n} УРОК ({shift} ЗМ.)" if shift != 1 else f"{n} УРОК"
+        segments.append((s, e, f"{title}\n ", max(1, e - s)))
+        # перерва — лише коли не йде жоден урок, зокрема довгий з попередніх
+        busy = max(busy, e)
+        if i + 1 < len(lessons):
+            b_start = lessons[i + 1][0]
+            if busy < b_start:
+                segments.append((busy, b_start, "ПЕРЕРВА\n", max(1, b_start - busy)))
+    reach = []
+    latest = 0
+    for seg in segments:
+        latest = max(latest, seg[1])
+        reach.append(latest)
+    return [seg[0] for seg in segments], segments, reach
+
+
+def clean_schedule_rows(rows) -> list:
+    """Валідні рядки розкладу з конфігу (n, зміна, start, end і прив'язані записи)"""
+    cleaned = []
+    if not isinstance(rows, list):
+        return cleaned
+    for it in rows:
+        if isinstance(it, dict) and "n" in it and "start" in it and "end" in it:
+            if is_hhmm(str(it["start"])) and is_hhmm(str(it["end"])):
+                item = {"n": safe_int(it["n"], 0), "start": str(it["start"]), "end": str(it["end"])}
+                shift = safe_int(it.get("shift"), 1)
+                if shift > 1:
+                    item["shift"] = shift
+                for rk in ("recording_start", "recording_end"):
+                    if it.get(rk):
+                        item[rk] = str(it[rk])
+                cleaned.append(item)
+    return cleaned
+
+
+def parse_date(s):
+    try:
+        return date.fromisoformat(str(s))
+    except ValueError:
+        return None
+
+
+def number_lessons(rows: list) -> list:
+    """Сортує уроки за зміною і часом початку та нумерує їх у межах зміни"""
+    rows = sorted(rows, key=lambda it: (it.get("shift", 1), hhmm_to_seconds(it["start"])))
+    counters = {}
+    for it in rows:
+        shift = it.get("shift", 1)
+        counters[shift] = counters.get(shift, 0) + 1
+        it["n"] = counters[shift]
+    return rows
+
+
+MAIN_PROFILE = "main"
+
+
+class ScheduleCalendar:
+    """Який розклад діє на яку дату.
+
+    Пріоритет: разова зміна на дату > діапазон канікул/свят > день тижня.
+    Профіль "main" — основний розклад, "" — день без дзвінків, невідома
+    назва — теж основний (щоб описка не вимкнула дзвінки). Кожен профіль
+    компілюється в таймлайн і відрізки один раз; вибір на дату — пошук
+    у словнику і bisect по діапазонах.
+    """
+
+    def __init__(self, main_rows: list, profiles: dict = None, weekdays=None, overrides: dict = None, holidays=None):
+        self._rows = dict(profiles or {})
+        self._rows[MAIN_PROFILE] = main_rows
+        self.weekdays = list(weekdays) if weekdays and len(weekdays) == 7 else [MAIN_PROFILE] * 7
+
+        self._overrides = {}
+        for key, profile in (overrides or {}).items():
+            day = parse_date(key)
+            if day is not None:
+                self._overrides[day] = profile
+
+        ranges = []
+        for it in holidays or []:
+            start, end = parse_date(it.get("from")), parse_date(it.get("to"))
+            if start is not None and end is not None and start <= end:
+                ranges.append((start, end, it.get("profile", "")))
+        ranges.sort(key=lambda r: r[0])
+        self._range_starts = [r[0] for r in ranges]
+        self._ranges = ranges
+        # найпізніший кінець серед діапазонів 0..i — щоб зупинити пошук назад
+        self._reach = []
+        reach = date.min
+        for r in ranges:
+            reach = max(reach, r[1])
+            self._reach.append(reach)
+
+        self._compiled = {}
+
+    def profile_for(self, day: date) -> str:
+        profile = self._overrides.get(day)
+        if profile is not None:
+            return profile
+        i = bisect_right(self._range_starts, day) - 1
+        while i >= 0 and self._reach[i] >= day:
+            if self._ranges[i][1] >= day:
+                return self._ranges[i][2]
+            i -= 1
+        return self.weekdays[day.weekday()]
+
+    def plan(self, day: date) -> tuple:
+        """(назва профілю, таймлайн, відрізки) на дату"""
+        profile = self.profile_for(day)
+        if profile and profile not in self._rows:
+            profile = MAIN_PROFILE
+        compiled = self._compiled.get(profile)
+        if compiled is None:
+            rows = self._rows[profile] if profile else []
+            compiled = (compile_timeline(rows), compile_segments(rows))
+            self._compiled[profile] = compiled
+        return (profile,) + compiled
+
+
+def find_segment(compiled: tuple, now_sec: int):
+    """Знаходить відрізок, що містить now_sec (з найпізнішим початком серед таких).
+
+    Відрізки можуть перекриватися (зміни, довгі позаурочні блоки), тож пошук
+    іде назад від bisect, доки найпізніший кінець відрізків ліворуч ще
+    дістає до now_sec.
+    """
+    starts, segments, reach = compiled
+    j = bisect_right(starts, now_sec) - 1
+    while j >= 0 and reach[j] > now_sec:
+        seg = segments[j]
+        if seg[1] > now_sec:
+            return seg
+        j -= 1
+    return None
+
+
+class NameIndex:
+    """Відсортований за алфавітом індекс назв записів для списку і пошуку.
+
+    Ключі (casefold) обчислюються раз при додаванні; додавання, видалення і
+    перейменування змінюють лише одну позицію. Пошук повертає спершу назви,
+    що починаються з запиту (бінарний пошук), потім ті, що його містять.
+    """
+
+    def __init__(self, names=()):
+        self._keys = []
+        self._names = []
+        self.version = 0
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return isinstance(name, str) and self._find(name) >= 0
+
+    def _find(self, name) -> int:
+        key = name.casefold()
+        i = bisect_left(self._keys, key)
+        while i < len(self._keys) and self._keys[i] == key:
+            if self._names[i] == name:
+                return i
+            i += 1
+        return -1
+
+    def add(self, name: str):
+        if self._find(name) >= 0:
+            return
+        key = name.casefold()
+        i = bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._names.insert(i, name)
+        self.version += 1
+
+    def remove(self, name: str):
+        i = self._find(name)
+        if i >= 0:
+            del self._keys[i]
+            del self._names[i]
+            self.version += 1
+
+    def rename(self, old: str, new: str):
+        self.remove(old)
+        self.add(new)
+
+    def sync(self, names):
+        """Доводить індекс до набору names, чіпаючи лише різницю"""
+        names = set(names)
+        current = set(self._names)
+        for name in current - names:
+            self.remove(name)
+        for name in names - current:
+            self.add(name)
+
+    def search(self, query: str = "") -> list:
+        query = query.strip().casefold()
+        if not query:
+            return list(self._names)
+        i = bisect_left(self._keys, query)
+        j = i
+        while j < len(self._keys) and self._keys[j].startswith(query):
+            j += 1
+        inner = [n for k, n in zip(self._keys, self._names) if query in k and not k.startswith(query)]
+        return self._names[i:j] + inner
+
+
+def atomic_write_text(path: Path, text: str):
+    """Пише файл через тимчасовий з fsync і атомарний os.replace"""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def recording_usage(schedule: list, profiles: dict) -> dict:
+    """Зворотний індекс: назва запису -> список слотів (профіль, індекс рядка, "start"/"end")"""
+    usage = {}
+    for profile, rows in [(MAIN_PROFILE, schedule)] + sorted(profiles.items()):
+        for i, it in enumerate(rows):
+            for when in ("start", "end"):
+                name = it.get("recording_" + when)
+                if name:
+                    usage.setdefault(name, []).append((profile, i, when))
+    return usage
+
+
+def analyze_wav(path, points: int = WAVE_POINTS) -> dict:
+    """Тривалість, пік і RMS (0..1 від повної шкали) та мініатюра хвилі WAV-файла.
+
+    Мініатюра — points значень 0..100: пік модуля амплітуди в кожному з
+    рівних відрізків запису.
+    """
+    import numpy as np
+
+    with wave.open(str(path), "rb") as w:
+        rate = w.getframerate()
+        width = w.getsampwidth()
+        channels = w.getnchannels()
+        frames = w.getnframes()
+        raw = w.readframes(frames)
+
+    if width == 1:
+        data = np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0
+        full = 128.0
+    elif width in (2, 4):
+        data = np.frombuffer(raw, dtype=np.int16 if width == 2 else np.int32).astype(np.float32)
+        full = float(2 ** (8 * width - 1))
+    else:
+        raise ValueError(f"непідтримувана розрядність WAV: {width * 8} біт")
+
+    data = np.abs(data[: len(data) - len(data) % channels]).reshape(-1, channels).max(axis=1) / full
+    if not data.size:
+        return {"duration": 0.0, "peak": 0.0, "rms": 0.0, "wave": []}
+
+    n = min(points, data.size)
+    buckets = np.maximum.reduceat(data, np.arange(n) * data.size // n)
+    return {
+        "duration": round(data.size / rate, 2) if rate else 0.0,
+        "peak": round(float(data.max()), 4),
+        "rms": round(float(np.sqrt(np.mean(np.square(data, dtype=np.float64)))), 4),
+        "wave": [int(round(v * 100)) for v in np.clip(buckets, 0.0, 1.0)],
+    }
+
+
+class RecordingLibrary:
+    """Метадані записів (тривалість, рівні, хвиля) у library.json, прив'язані до розміру і mtime файла"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._store = ConfigStore(self.path)
+        self._items = None
+        self._dirty = False
+
+    def _data(self) -> dict:
+        if self._items is None:
+            self._items = self._store.load() or {}
+        return self._items
+
+    def cached(self, name: str):
+        """Збережені метадані без звернення до диска (або None)"""
+        return self._data().get(name)
+
+    @staticmethod
+    def stamp_of(filepath: str):
+        """[розмір, mtime_ns] файла або None, якщо його нема"""
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def fresh(self, name: str, filepath: str, stamp: list):
+        """Збережені метадані, якщо вони відповідають файлу з цим stamp (або None)"""
+        item = self._data().get(name)
+        if item is not None and item.get("path") == filepath and item.get("stamp") == stamp:
+            return item
+        return None
+
+    @staticmethod
+    def build(filepath: str) -> dict:
+        """Аналізує файл; нечитабельний як WAV дає запис без рівнів"""
+        stamp = RecordingLibrary.stamp_of(filepath)
+        if stamp is None:
+            raise FileNotFoundError(filepath)
+        try:
+            meta = analyze_wav(filepath)
+        except Exception:
+            meta = {}
+        return dict(meta, path=filepath, stamp=stamp)
+
+    def store(self, name: str, item: dict):
+        self._data()[name] = item
+        self._dirty = True
+
+    def rename(self, old: str, new: str):
+        items = self._data()
+        if old in items:
+            items[new] = items.pop(old)
+            self._dirty = True
+
+    def remove(self, name: str):
+        if self._data().pop(name, None) is not None:
+            self._dirty = True
+
+    def prune(self, names):
+        """Забуває записи, яких більше нема в конфігу"""
+        items = self._data()
+        for name in set(items) - set(names):
+            del items[name]
+            self._dirty = True
+
+    def save(self):
+        """Відкладений запис у фоновому потоці, як у config.json"""
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._store.save(self._items)
+            self._dirty = False
+        except Exception:
+            pass
+
+    def flush(self):
+        """Негайно записує відкладені зміни (при закритті)"""
+        self.save()
+        self._store.flush()
+
+
+class SoundBank:
+    """Кеш декодованих звуків pygame.mixer.Sound.
+
+    Ключ — (шлях, mtime), тож змінений на диску файл декодується заново.
+    Загальний розмір буферів обмежений бюджетом, найдавніше використані
+    звуки витісняються (LRU). Тривалість кожного файлу запам'ятовується
+    окремо і переживає витіснення буфера.
+    """
+
+    def __init__(self, budget_bytes: int = 96 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._lock = threading.RLock()
+        self._sounds = OrderedDict()  # path -> (mtime, Sound, size)
+        self._lengths = {}  # (path, mtime) -> seconds
+        self._used = 0
+
+    @staticmethod
+    def _mtime(path: str):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _estimate_size(snd) -> int:
+        import pygame
+        try:
+            freq, fmt, channels = pygame.mixer.get_init()
+            return int(snd.get_length() * freq * channels * (abs(fmt) // 8))
+        except Exception:
+            return 0
+
+    def get(self, path: str):
+        """Повертає декодований звук або None, якщо файл не читається"""
+        if not path:
+            return None
+        mtime = self._mtime(path)
+        if mtime is None:
+            self.discard(path)
+            return None
+        with self._lock:
+            cached = self._sounds.get(path)
+            if cached and cached[0] == mtime:
+                self._sounds.move_to_end(path)
+                return cached[1]
+        import pygame
+        try:
+            snd = pygame.mixer.Sound(path)
+        except Exception:
+            return None
+        size = self._estimate_size(snd)
+        with self._lock:
+            self._drop(path)
+            self._sounds[path] = (mtime, snd, size)
+            self._lengths[(path, mtime)] = snd.get_length()
+            self._used += size
+            self._evict(keep=path)
+        return snd
+
+    def length(self, path: str):
+        """Тривалість звуку в секундах з кешу метаданих (або None)"""
+        mtime = self._mtime(path) if path else None
+        if mtime is None:
+            return None
+        with self._lock:
+            known = self._lengths.get((path, mtime))
+        if known is not None:
+            return known
+        snd = self.get(path)
+        return snd.get_length() if snd else None
+
+    def preload(self, paths):
+        for path in paths:
+            if path:
+                self.get(path)
+
+    def discard(self, path: str):
+        with self._lock:
+            self._drop(path)
+
+    def _drop(self, path: str):
+        old = self._sounds.pop(path, None)
+        if old:
+            self._used -= old[2]
+
+    def _evict(self, keep: str):
+        while self._used > self.budget_bytes and len(self._sounds) > 1:
+            path = next(iter(self._sounds))
+            if path == keep:
+                self._sounds.move_to_end(path)
+                continue
+            self._drop(path)
+
+
+class AudioEngine:
+    """Єдиний аудіорушій поверх pygame.mixer.
+
+    Має фіксований пул каналів, по одному на пріоритет: сирена > хвилина
+    мовчання > дзвінки > прослуховування. Звук нижчого пріоритету не
+    стартує, поки грає вищий, а вищий одразу зупиняє всі нижчі. Буфери
+    беруться з SoundBank.
+
+    pygame імпортується і аудіопристрій відкривається лише в start(),
+    який play() викликає сам, якщо фоновий старт ще не встиг.
+    """
+
+    PREVIEW = 0
+    BELL = 1
+    MOS = 2
+    SIREN = 3
+
+    def __init__(self, bank: SoundBank):
+        self.bank = bank
+        self._lock = threading.RLock()
+        self._mixer = None
+        self._channels = None
+        # пріоритет, якому належить потоковий pygame.mixer.music (або None)
+        self._music_priority = None
+
+    def start(self) -> bool:
+        """Ініціалізує pygame.mixer і канали; повторні виклики нічого не роблять"""
+        with self._lock:
+            if self._channels is not None:
+                return True
+            try:
+                import pygame
+                pygame.mixer.init()
+                pygame.mixer.set_num_channels(max(8, pygame.mixer.get_num_channels()))
+                pygame.mixer.set_reserved(self.SIREN + 1)
+                self._channels = [pygame.mixer.Channel(i) for i in range(self.SIREN + 1)]
+                self._mixer = pygame.mixer
+                return True
+            except Exception:
+                return False
+
+    def busy(self, priority: int) -> bool:
+        with self._lock:
+            if self._channels is None:
+                return False
+            if self._music_priority == priority and self._mixer.music.get_busy():
+                return True
+            return self._channels[priority].get_busy()
+
+    def _higher_busy(self, priority: int) -> bool:
+        return any(self.busy(p) for p in range(priority + 1, self.SIREN + 1))
+
+    def play(self, path: str, priority: int, loops: int = 0) -> bool:
+        """Грає файл на каналі свого пріоритету, витісняючи нижчі"""
+        if not path or not os.path.exists(path) or not self.start():
+            return False
+        snd = self.bank.get(path)
+        with self._lock:
+            if self._higher_busy(priority):
+                return False
+            self.stop_below(priority + 1)
+            try:
+                if snd is not None:
+                    snd.set_volume(1.0)
+                    self._channels[priority].play(snd, loops=loops)
+                    return True
+                # формат, який Sound не декодує, — потоковий music
+                self._mixer.music.set_volume(1.0)
+                self._mixer.music.load(path)
+                self._mixer.music.play(loops=loops)
+                self._music_priority = priority
+                return True
+            except Exception:
+                return False
+
+    def stop(self, priority: int):
+        with self._lock:
+            if self._channels is None:
+                return
+            try:
+                self._channels[priority].stop()
+                if self._music_priority == priority:
+                    self._mixer.music.stop()
+                    self._music_priority = None
+            except Exception:
+                pass
+
+    def stop_below(self, priority: int):
+        for p in range(priority):
+            self.stop(p)
+
+    def stop_all(self):
+        self.stop_below(self.SIREN + 1)
+
+
+class AlertPoller:
+    """Фоновий опитувач API тривог.
+
+    Працює у власному потоці з постійною сесією requests (keep-alive) і
+    передає отримані статуси в Tk через потокобезпечну чергу. Усі регіони
+    перевіряються одним запитом до зведеного рядка статусів; у чергу йде
+    словник {uid: "A"/"P"/"N"}. При помилках і не-200 відповідях інтервал
+    зростає експоненційно з джитером.
+    """
+
+    URL = "https://api.alerts.in.ua/v1/iot/active_air_raid_alerts.json"
+
+    INTERVAL = 7.0
+    MAX_BACKOFF = 120.0
+    TIMEOUT = 6
+
+    def __init__(self):
+        self.results = queue.Queue()
+        self._lock = threading.Lock()
+        self._token = ""
+        self._uids = ()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._session = None
+        self._errors = 0
+        self._etag = None
+        self._last_modified = None
+        self._last_status = None
+
+    def configure(self, token: str, uids):
+        uids = tuple(uids)
+        with self._lock:
+            changed = (token, uids) != (self._token, self._uids)
+            token_changed = token != self._token
+            self._token = token
+            self._uids = uids
+            if token_changed:
+                self._etag = None
+                self._last_modified = None
+                self._last_status = None
+                self._errors = 0
+        if changed:
+            self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._session is not None:
+            try:
+                self._session.close()
+            except Exception:
+                pass
+
+    def _next_delay(self) -> float:
+        if not self._errors:
+            return self.INTERVAL
+        cap = min(self.MAX_BACKOFF, self.INTERVAL * (2 ** self._errors))
+        return random.uniform(self.INTERVAL, cap)
+
+    def _run(self):
+        import requests
+        self._session = requests.Session()
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self._poll_once()
+            except Exception:
+                self._errors += 1
+            self._wake.wait(self._next_delay())
+
+    def _poll_once(self):
+        with self._lock:
+            token, uids = self._token, self._uids
+            headers = {"Authorization": f"Bearer {token}"}
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        if not token or not uids:
+            return
+
+        r = self._session.get(self.URL, headers=headers, timeout=self.TIMEOUT)
+
+        if r.status_code == 304 and self._last_status is not None:
+            self._errors = 0
+            with self._lock:
+                self.results.put(evaluate_alert_regions(self._last_status, self._uids))
+            return
+        if r.status_code != 200:
+            self._errors += 1
+            return
+
+        statuses = r.text.strip().strip('"')
+        with self._lock:
+            if token != self._token:
+                return
+            self._etag = r.headers.get("ETag")
+            self._last_modified = r.headers.get("Last-Modified")
+            self._last_status = statuses
+            self.results.put(evaluate_alert_regions(statuses, self._uids))
+        self._errors = 0
+
+
+class ConfigStore:
+    """Відкладене атомарне збереження config.json у фоновому потоці з копією в .bak"""
+
+    def __init__(self, path: Path, delay: float = 0.5):
+        self.path = Path(path)
+        self.backup_path = self.path.with_name(self.path.name + ".bak")
+        self.conflict_path = self.path.with_name(self.path.name + ".conflict")
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending = None
+        self._written = None
+        self._timer = None
+        self._stat = None
+
+    def _current_stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def changed_on_disk(self) -> bool:
+        """Чи змінив config.json хтось інший (наш запис не рахується)"""
+        with self._lock:
+            if self._pending is not None:
+                return False
+        return self._current_stat() != self._stat
+
+    def load(self, fallback: bool = True):
+        """Дані з config.json, а якщо він битий і fallback — з резервної копії (або None)"""
+        paths = (self.path, self.backup_path) if fallback else (self.path,)
+        for path in paths:
+            stat = self._current_stat() if path == self.path else None
+            try:
+                text = path.read_text(encoding="utf-8")
+                data = json.loads(text)
+            except Exception:
+                continue
+            if isinstance(data, dict):
+                if path == self.path:
+                    self._written = text
+                    self._stat = stat
+                return data
+        return None
+
+    def quarantine(self):
+        """Відкладає нечитабельний config.json убік, щоб не затерти його"""
+        try:
+            if self.path.exists():
+                os.replace(self.path, self.path.with_name(self.path.name + ".broken"))
+        except OSError:
+            pass
+
+    def save(self, data: dict):
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        with self._lock:
+            if text == (self._pending if self._pending is not None else self._written):
+                return
+            self._pending = text
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Негайно записує відкладені зміни (напр. при закритті)"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            text, self._pending = self._pending, None
+        if text is None or text == self._written:
+            return
+        with self._io_lock:
+            try:
+                current = self._current_stat()
+                if current is not None and current != self._stat:
+                    # файл змінили ззовні, поки запис чекав: їхню версію не затираємо
+                    os.replace(self.path, self.conflict_path)
+                    print(f"{self.path.name} змінено ззовні під час збереження; ту версію збережено як {self.conflict_path.name}")
+                if self._written is not None:
+                    atomic_write_text(self.backup_path, self._written)
+                atomic_write_text(self.path, text)
+                self._written = text
+                self._stat = self._current_stat()
+            except Exception:
+                pass
+
+
+class StartupTimer:
+    """Відмітки етапів запуску в мс від t0 для звіту про швидкість старту.
+
+    Кожен етап фіксується один раз (перша відмітка), тож повторні
+    виклики, напр. при перезавантаженні конфігу, звіт не псують.
+    """
+
+    KEEP = 200
+
+    def __init__(self, t0: float = None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, stage: str):
+        ms = round((time.perf_counter() - self.t0) * 1000, 1)
+        with self._lock:
+            self.marks.setdefault(stage, ms)
+
+    def has(self, stage: str) -> bool:
+        with self._lock:
+            return stage in self.marks
+
+    def report(self) -> str:
+        with self._lock:
+            items = list(self.marks.items())
+        return "\n".join(f"{stage:<10} {ms:8.1f} мс" for stage, ms in items)
+
+    def save(self, path: Path):
+        """Дописує запуск рядком JSON у path, лишаючи останні KEEP запусків"""
+        with self._lock:
+            line = json.dumps({"date": datetime.now().isoformat(timespec="seconds"), "marks": dict(self.marks)})
+        try:
+            path = Path(path)
+            lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+            lines = lines[-(self.KEEP - 1):] + [line]
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        except Exception:
+            pass
+
+
+class FiredBitmap:
+    """Які події таймлайну вже оброблені за одну дату: біт i — подія i.
+
+    Прив'язана до конкретного таймлайну; зміна розкладу чи дати — reset().
+    """
+
+    def __init__(self):
+        self.date = None
+        self.timeline = None
+        self.bits = bytearray()
+
+    def reset(self, day, timeline, upto_sec: int = -1):
+        """Нова бітмапа; події з секундою <= upto_sec вважаються вже обробленими"""
+        secs = timeline[0]
+        self.date = day
+        self.timeline = timeline
+        self.bits = bytearray((len(secs) + 7) // 8)
+        for i in range(bisect_right(secs, upto_sec)):
+            self.set(i)
+
+    def test(self, i: int) -> bool:
+        return bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def set(self, i: int):
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+
+class BellTimingLog:
+    """Кільцевий буфер вимірів точності дзвінків.
+
+    На кожну подію зберігає запланований час, запізнення моменту, коли
+    воркер її помітив, і запізнення старту звуку (коли аудіорушій віддав
+    буфер каналу mixer). Затримки — у мс від запланованого часу.
+    """
+
+    BINS_MS = (10, 25, 50, 100, 250, 500, 1000, 2000)
+
+    def __init__(self, size: int = 512):
+        self._lock = threading.Lock()
+        self._items = deque(maxlen=size)
+        self._clock_steps = deque(maxlen=32)
+
+    @staticmethod
+    def _ms(later: datetime, earlier: datetime) -> float:
+        return round((later - earlier).total_seconds() * 1000, 1)
+
+    def record(self, scheduled: datetime, noticed: datetime, started, kind: str, n, missed: bool = False):
+        """started=None — звук не стартував; missed — подію пропущено поза вікном запізнення"""
+        item = {
+            "scheduled": scheduled.isoformat(timespec="milliseconds"),
+            "kind": kind,
+            "n": n,
+            "noticed_ms": self._ms(noticed, scheduled),
+            "started_ms": self._ms(started, scheduled) if started is not None else None,
+            "missed": missed,
+        }
+        with self._lock:
+            self._items.append(item)
+
+    def record_clock_step(self, at: datetime, step_seconds: float):
+        with self._lock:
+            self._clock_steps.append({"at": at.isoformat(timespec="seconds"), "step_s": round(step_seconds, 3)})
+
+    def clock_steps(self) -> list:
+        with self._lock:
+            return list(self._clock_steps)
+
+    def entries(self) -> list:
+        with self._lock:
+            return list(self._items)
+
+    def histogram(self, field: str = "started_ms") -> list:
+        """[(межа в мс або None для «більше», кількість)] + ("silent", без звуку) + ("missed", пропущені)"""
+        counts = [0] * (len(self.BINS_MS) + 1)
+        silent = missed = 0
+        for it in self.entries():
+            v = it[field]
+            if it.get("missed"):
+                missed += 1
+            elif v is None:
+                silent += 1
+            else:
+                counts[bisect_right(self.BINS_MS, v)] += 1
+        return list(zip(self.BINS_MS + (None,), counts)) + [("silent", silent), ("missed", missed)]
+
+    def summary(self, field: str = "started_ms") -> dict:
+        values = sorted(it[field] for it in self.entries() if it[field] is not None)
+        if not values:
+            return {"count": 0, "p50": None, "p95": None, "max": None}
+        return {
+            "count": len(values),
+            "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max": values[-1],
+        }
+
+    def report(self) -> str:
+        hist = self.histogram()
+        summ = self.summary()
+        lines = [f"Старт звуку після розкладу, дзвінків: {summ['count']}"]
+        if summ["count"]:
+            lines.append(f"p50 {summ['p50']:.0f} мс · p95 {summ['p95']:.0f} мс · макс {summ['max']:.0f} мс")
+        top = max((c for _, c in hist), default=0) or 1
+        lo = 0
+        for edge, count in hist:
+            if edge == "silent":
+                label = "без звуку"
+            elif edge == "missed":
+                label = "пропущено"
+            elif edge is None:
+                label = f"≥{lo}"
+            else:
+                label = f"{lo}–{edge}"
+                lo = edge
+            lines.append(f"{label:>10} {'█' * round(20 * count / top):<20} {count}")
+        return "\n".join(lines)
+
+    def export(self, path):
+        data = {
+            "exported": datetime.now().isoformat(timespec="seconds"),
+            "bins_ms": list(self.BINS_MS),
+            "noticed": {"summary": self.summary("noticed_ms"), "histogram": self.histogram("noticed_ms")},
+            "started": {"summary": self.summary("started_ms"), "histogram": self.histogram("started_ms")},
+            "events": self.entries(),
+            "clock_steps": self.clock_steps(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class BellCore:
+    """Логіка дзвінків, спільна для GUI і демона.
+
+    Міксин: клієнт викликає _init_core(), потім _load_config() і
+    _start_core(). Хуки _on_mos_start/_on_mos_end клієнт перевизначає,
+    щоб показати або сховати свій інтерфейс.
+    """
+
+    def _init_core(self, base_dir: Path, startup: StartupTimer = None):
+        """Стан і підсистеми ядра; викликається до _load_config().
+
+        Аудіо і мережа тут лише створюються, без імпорту pygame/requests:
+        їх запускає _start_core() вже після першого малювання вікна.
+        """
+        self._startup = startup if startup is not None else StartupTimer()
+        self._sound_bank = SoundBank()
+        self._audio = AudioEngine(self._sound_bank)
+
+        self.base_dir = Path(base_dir)
+        self.config_path = self.base_dir / CONFIG_NAME
+        self._config_store = ConfigStore(self.config_path)
+        self._library = RecordingLibrary(self.base_dir / RECORDINGS_DIR_NAME / LIBRARY_NAME)
+        self._recording_usage = {}
+        self._recording_usage_version = 0
+
+        for k, v in DEFAULTS.items():
+            setattr(self, k, copy.deepcopy(v))
+        self.custom_recordings = {}
+        self.hibernation_enabled = False
+        self.hibernation_time = "00:00"
+        self.autostart_enabled = False
+
+        self._alarm_priority = False
+        self._time_offset = timedelta(0)
+
+        self._mos_last_date = None
+        self._mos_active = False
+        self._mos_end_time = None
+        self._shutdown_last_date = None
+
+        self._worker_stop = threading.Event()
+        self._worker_wake = threading.Event()
+        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self._timeline = ([], [])
+        self._segments = ([], [], [])
+        self._calendar = None
+        self._plan_date = None
+        self._plan_profile = MAIN_PROFILE
+        self._set_schedule([dict(x) for x in DEFAULT_SCHEDULE_12])
+
+        # КЛЮЧОВЕ ВИПРАВЛЕННЯ: антидубль дзвінків
+        self._bell_fired = FiredBitmap()
+        # (monotonic, now_dt, зсув тест-часу) попереднього проходу воркера
+        self._worker_last = None
+        self._bell_timing = BellTimingLog()
+
+        self._alert_poller = AlertPoller()
+
+    def _start_core(self):
+        """Запускає підсистеми в порядку потреби: дзвінки, звук, тривоги"""
+        self._worker_thread.start()
+        self._preload_sounds()
+        self._alert_poller.configure(self.ALERTS_TOKEN, self.ALERT_UIDS)
+        self._alert_poller.start()
+        self._startup.mark("core")
+
+    def _stop_core(self):
+        self._worker_stop.set()
+        self._worker_wake.set()
+        self._alert_poller.stop()
+        self._audio.stop_all()
+
+    def _resolve_path(self, path: str) -> str:
+        if not path:
+            return ""
+        try:
+            if os.path.isabs(path):
+                return path
+            return str((self.base_dir / path).resolve())
+        except Exception:
+            return path
+
+    def _basename(self, path: str) -> str:
+        try:
+            return os.path.basename(path) if path else ""
+        except Exception:
+            return ""
+
+    def _now_dt(self):
+        return now_local() + (self._time_offset if self.test_mode_on else timedelta(0))
+
+    def _preload_sounds(self):
+        """Відкриває аудіо і декодує всі налаштовані звуки у фоні, щоб дзвінок грав без затримки"""
+        paths = [
+            self._resolve_path(self.lesson_start_sound_path),
+            self._resolve_path(self.lesson_end_sound_path),
+            self._resolve_path(self.minute_of_silence_sound_path),
+            self._resolve_path(self.siren_sound_path),
+        ]
+        paths += [rec.get("path", "") for rec in self.custom_recordings.values()]
+        threading.Thread(target=self._warm_audio, args=(paths,), daemon=True).start()
+
+    def _warm_audio(self, paths):
+        self._audio.start()
+        self._sound_bank.preload(paths)
+        self._startup.mark("audio")
+
+    def _stop_all_non_alarm_audio(self):
+        self._audio.stop_below(AudioEngine.SIREN)
+
+    def _play_sound(self, path: str, priority: int = AudioEngine.BELL) -> bool:
+        if self._alarm_priority:
+            return False
+        return self._audio.play(self._resolve_path(path), priority)
+
+    def _start_siren(self):
+        if not self._audio.busy(AudioEngine.SIREN):
+            self._audio.play(self._resolve_path(self.siren_sound_path), AudioEngine.SIREN, loops=-1)
+
+    def _stop_siren(self):
+        self._audio.stop(AudioEngine.SIREN)
+
+    def _play_recording(self, name: str, priority: int = AudioEngine.PREVIEW) -> bool:
+        """Відтворює записаний звук через спільний аудіорушій; True — звук справді почав грати.
+
+        Відсутній файл окремо повідомляється через _on_recording_missing().
+        """
+        rec = self.custom_recordings.get(name)
+        filepath = rec.get("path", "") if rec else ""
+        if not filepath or not os.path.exists(filepath):
+            self._on_recording_missing(name, priority)
+            return False
+        if self._alarm_priority:
+            return False
+        return self._audio.play(filepath, priority)
+
+    def _on_recording_missing(self, name: str, priority: int):
+        """Хук для клієнта: файла запису name нема на диску"""
+
+    def _drain_alert_results(self):
+        """Останній статус регіонів від опитувача або None, якщо нового нема"""
+        regions = None
+        while True:
+            try:
+                regions = self._alert_poller.results.get_nowait()
+            except queue.Empty:
+                return regions
+
+    def _alarm_on(self):
+        self._alarm_priority = True
+        self._stop_all_non_alarm_audio()
+        self._start_siren()
+
+    def _alarm_off(self):
+        self._alarm_priority = False
+        self._stop_siren()
+
+    def _minute_of_silence_tick(self, now_dt: datetime):
+        if self._alarm_priority:
+            return
+
+        if not self.minute_of_silence_enabled:
+            if self._mos_active:
+                self._mos_active = False
+                self._mos_end_time = None
+                self._on_mos_end()
+            return
+
+        today = now_dt.date()
+
+        if self._mos_active:
+            if self._mos_end_time and now_dt >= self._mos_end_time:
+                self._mos_active = False
+                self._mos_end_time = None
+                self._on_mos_end()
+            return
+
+        if self._mos_last_date == today:
+            return
+
+        if now_dt.hour == 9 and now_dt.minute == 0 and now_dt.second <= 2:
+            self._mos_last_date = today
+            self._mos_active = True
+            self._on_mos_start()
+
+            duration_sec = 60
+            length = self._sound_bank.length(self._resolve_path(self.minute_of_silence_sound_path))
+            if length is not None:
+                duration_sec = max(5, int(length) + 1)
+
+            self._mos_end_time = now_dt + timedelta(seconds=duration_sec)
+
+            if not self.silent_mode:
+                self._play_sound(self.minute_of_silence_sound_path, AudioEngine.MOS)
+
+    def _on_mos_start(self):
+        """Хук для клієнта: почалась хвилина мовчання"""
+
+    def _on_mos_end(self):
+        """Хук для клієнта: хвилина мовчання закінчилась"""
+
+    def _set_schedule(self, rows: list):
+        """Замінює основний розклад і перебудовує календар"""
+        self.schedule = rows
+        self._rebuild_calendar()
+
+    def _rebuild_calendar(self):
+        self._recording_usage = recording_usage(self.schedule, self.schedule_profiles)
+        self._recording_usage_version += 1
+        self._calendar = ScheduleCalendar(
+            self.schedule, self.schedule_profiles, self.schedule_weekdays,
+            self.schedule_overrides, self.schedule_holidays,
+        )
+        self._plan_date = None
+        self._refresh_day_plan(self._now_dt().date())
+        self._worker_wake.set()
+
+    def _refresh_day_plan(self, day: date):
+        """Розклад на день визначається раз на добу; проходи воркера беруть готовий таймлайн"""
+        if day == self._plan_date:
+            return
+        profile, timeline, segments = self._calendar.plan(day)
+        self._plan_profile = profile
+        self._timeline = timeline
+        self._segments = segments
+        self._plan_date = day
+
+    def _fire_bell(self, kind: str, rec_name: str) -> bool:
+        # If a custom recording is attached, play it, else play default sound
+        if rec_name and rec_name in self.custom_recordings:
+            return self._play_recording(rec_name, AudioEngine.BELL)
+        elif kind == "start":
+            return self._play_sound(self.lesson_start_sound_path)
+        else:
+            return self._play_sound(self.lesson_end_sound_path)
+
+    def _worker_loop(self):
+        while not self._worker_stop.is_set():
+            self._worker_wake.clear()
+            delay = self._worker_tick(self._now_dt())
+            self._worker_wake.wait(max(0.0, delay))
+
+    def _worker_tick(self, now_dt: datetime) -> float:
+        """Один прохід воркера: дзвінки і вимкнення на now_dt; повертає паузу до наступної події.
+
+        Обробляє всі події з часу попереднього проходу, а не лише поточну
+        секунду, тож зависання, сон ПК чи стрибок годинника дзвінок не
+        губить: запізнілий не більше ніж на bell_grace_seconds дзвонить,
+        старіший записується як пропущений.
+        """
+        noticed = time.perf_counter()
+        mono = time.monotonic()
+        now_sec = seconds_of_day(now_dt)
+        cur_sec = int(now_sec)
+        today = now_dt.date()
+        self._refresh_day_plan(today)
+        timeline = self._timeline
+        secs, events = timeline
+
+        offset = self._time_offset if self.test_mode_on else timedelta(0)
+        last = self._worker_last
+        self._worker_last = (mono, now_dt, offset)
+        if last is not None and last[2] != offset:
+            last = None  # тест-час змінено: починаємо з чистого аркуша
+        if last is not None:
+            step = (now_dt - last[1]).total_seconds() - (mono - last[0])
+            if abs(step) > CLOCK_STEP_TOLERANCE:
+                self._bell_timing.record_clock_step(now_dt, step)
+
+        # вікна (дата, від секунди виключно, до секунди включно) з минулого проходу
+        if last is None or last[1].date() > today:
+            windows = [(today, cur_sec - 1, cur_sec)]
+            if self._bell_fired.date != today or self._bell_fired.timeline is not timeline:
+                self._bell_fired.reset(today, timeline, cur_sec - 1)
+        elif last[1].date() == today:
+            # годинник назад (NTP, DST) дає порожнє вікно; бітмапа не дасть продзвонити вдруге
+            windows = [(today, int(seconds_of_day(last[1])), cur_sec)]
+        else:
+            windows = [(last[1].date(), int(seconds_of_day(last[1])), 86399), (today, -1, cur_sec)]
+
+        blocked = self._alarm_priority or self._mos_active or self.silent_mode
+        grace = self.bell_grace_seconds
+        for day, lo, hi in windows:
+            if hi <= lo:
+                continue
+            day_timeline = timeline if day == today else self._calendar.plan(day)[1]
+            day_secs, day_events = day_timeline
+            if self._bell_fired.date != day or self._bell_fired.timeline is not day_timeline:
+                self._bell_fired.reset(day, day_timeline, lo if day == self._bell_fired.date else -1)
+            midnight = datetime.combine(day, dt_time())
+            for i in range(bisect_right(day_secs, lo), bisect_right(day_secs, hi)):
+                if self._bell_fired.test(i):
+                    continue
+                self._bell_fired.set(i)
+                if blocked:
+                    continue
+                ev_sec, kind, n, rec_name = day_events[i]
+                scheduled = midnight + timedelta(seconds=ev_sec)
+                if (now_dt - scheduled).total_seconds() > grace:
+                    self._bell_timing.record(scheduled, now_dt, None, kind, n, missed=True)
+                    continue
+                played = self._fire_bell(kind, rec_name)
+                # старт звуку відраховуємо монотонно від моменту, коли подію помічено
+                started = now_dt + timedelta(seconds=time.perf_counter() - noticed) if played else None
+                self._bell_timing.record(scheduled, now_dt, started, kind, n)
+
+        shutdown_sec = None
+        if self.shutdown_enabled and is_hhmm(self.shutdown_time):
+            shutdown_sec = hhmm_to_seconds(self.shutdown_time)
+            day, lo, hi = windows[-1]
+            if lo < shutdown_sec <= hi and cur_sec - shutdown_sec <= grace and self._shutdown_last_date != today:
+                self._shutdown_last_date = today
+                try:
+                    subprocess.Popen(["shutdown", "/s", "/t", "0"], shell=False)
+                except Exception:
+                    pass
+
+        # спимо рівно до наступної події; monotonic-очікування перериває
+        # не пізніше WORKER_MAX_SLEEP, щоб помітити стрибок годинника
+        deadlines = []
+        i = bisect_right(secs, cur_sec)
+        if i < len(secs):
+            deadlines.append(secs[i])
+        if shutdown_sec is not None and shutdown_sec > cur_sec:
+            deadlines.append(shutdown_sec)
+        deadlines.append(86400)
+        return min(min(deadlines) - now_sec, WORKER_MAX_SLEEP)
+
+    def _load_config(self):
+        data = self._config_store.load()
+        if data is None:
+            self._config_store.quarantine()
+            self._apply_defaults()
+            self._save_config()
+            return
+
+        self._read_config_data(data)
+
+    def _read_config_data(self, data: dict):
+        def getv(k):
+            return data.get(k, DEFAULTS.get(k))
+
+        self.photo_path = getv("photo_path") or ""
+
+        self.lesson_start_sound_path = getv("lesson_start_sound_path") or ""
+        self.lesson_end_sound_path = getv("lesson_end_sound_path") or ""
+        self.siren_sound_path = getv("siren_sound_path") or ""
+        self.minute_of_silence_sound_path = getv("minute_of_silence_sound_path") or ""
+
+        # Load custom recordings
+        self.custom_recordings = getv("custom_recordings") or {}
+
+        self.ALERTS_TOKEN = getv("ALERTS_TOKEN") or ""
+        self.ALERT_UID = safe_int(getv("ALERT_UID"), 0)
+        self.ALERT_UIDS = parse_uid_list(getv("ALERT_UIDS") or [self.ALERT_UID])
+
+        self.minute_of_silence_enabled = bool(getv("minute_of_silence_enabled"))
+        self.candle_gif_path = getv("candle_gif_path") or ""
+        self.silent_mode = bool(getv("silent_mode"))
+
+        self.entry_lock_enabled = bool(getv("entry_lock_enabled"))
+        self.entry_password = getv("entry_password") or ""
+
+        self.shutdown_enabled = bool(getv("shutdown_enabled"))
+        st = getv("shutdown_time") or "00:00"
+        self.shutdown_time = st if is_hhmm(st) else "00:00"
+
+        self.hibernation_enabled = bool(getv("hibernation_enabled"))
+        ht = getv("hibernation_time") or "00:00"
+        self.hibernation_time = ht if is_hhmm(ht) else "00:00"
+
+        self.autostart_enabled = bool(getv("autostart_enabled"))
+        self.recording_max_seconds = max(1, safe_int(getv("recording_max_seconds"), 60))
+        self.bell_grace_seconds = max(0, safe_int(getv("bell_grace_seconds"), 60))
+
+        self.slideshow_enabled = bool(getv("slideshow_enabled"))
+        self.slideshow_dir = getv("slideshow_dir") or ""
+        self.slideshow_interval_seconds = max(3, safe_int(getv("slideshow_interval_seconds"), 15))
+        self.slideshow_prefetch = max(1, safe_int(getv("slideshow_prefetch"), 3))
+
+        rows = clean_schedule_rows(data.get("schedule")) or [dict(x) for x in DEFAULT_SCHEDULE_12]
+
+        profiles = getv("schedule_profiles")
+        profiles = {str(k): clean_schedule_rows(v) for k, v in profiles.items()} if isinstance(profiles, dict) else {}
+        weekdays = getv("schedule_weekdays")
+        weekdays = [str(x or "") for x in weekdays] if isinstance(weekdays, list) and len(weekdays) == 7 else [MAIN_PROFILE] * 7
+        overrides = getv("schedule_overrides")
+        overrides = {str(k): str(v or "") for k, v in overrides.items() if parse_date(k)} if isinstance(overrides, dict) else {}
+        holidays = []
+        for it in getv("schedule_holidays") or []:
+            if isinstance(it, dict) and parse_date(it.get("from")) and parse_date(it.get("to")):
+                holidays.append({"from": str(it["from"]), "to": str(it["to"]), "profile": str(it.get("profile") or "")})
+
+        calendar = (profiles, weekdays, overrides, holidays)
+        calendar_changed = calendar != (self.schedule_profiles, self.schedule_weekdays, self.schedule_overrides, self.schedule_holidays)
+        self.schedule_profiles, self.schedule_weekdays, self.schedule_overrides, self.schedule_holidays = calendar
+        if rows != self.schedule:
+            self._set_schedule(rows)
+        elif calendar_changed:
+            self._rebuild_calendar()
+
+        self.test_mode_on = bool(getv("test_mode_on"))
+        off = safe_int(getv("test_offset_seconds"), 0)
+        self._time_offset = timedelta(seconds=int(off)) if self.test_mode_on else timedelta(0)
+
+    def _check_config(self):
+        """Дешева перевірка stat() config.json; перечитує лише зовнішні зміни"""
+        try:
+            if self._config_store.changed_on_disk():
+                self._reload_config()
+        except Exception:
+            pass
+
+    def _apply_config_changes(self, changed: set):
+        """Застосовує лише змінені розділи конфігу"""
+        if changed & {"lesson_start_sound_path", "lesson_end_sound_path", "minute_of_silence_sound_path",
+                      "siren_sound_path", "custom_recordings"}:
+            self._preload_sounds()
+        if changed & {"ALERTS_TOKEN", "ALERT_UIDS"}:
+            self._alert_poller.configure(self.ALERTS_TOKEN, self.ALERT_UIDS)
+        if changed & {"shutdown_enabled", "shutdown_time", "test_mode_on", "test_offset_seconds"}:
+            self._worker_wake.set()
+
+    def _save_config(self):
+        try:
+            self._config_store.save(self._config_data())
+        except Exception:
+            pass
+
+    def _reload_config(self):
+        data = self._config_store.load(fallback=False)
+        if data is None:
+            return
+        old = self._config_data()
+        self._read_config_data(data)
+        new = self._config_data()
+        changed = {k for k in new if new[k] != old.get(k)}
+        if changed:
+            self._apply_config_changes(changed)
+
+    def _apply_defaults(self):
+        for k, v in DEFAULTS.items():
+            setattr(self, k, copy.deepcopy(v))
+        self._set_schedule([dict(x) for x in DEFAULT_SCHEDULE_12])
+
+    def _config_data(self) -> dict:
+        return {
+            "photo_path": self.photo_path,
+            "lesson_start_sound_path": self.lesson_start_sound_path,
+            "lesson_end_sound_path": self.lesson_end_sound_path,
+            "siren_sound_path": self.siren_sound_path,
+            "minute_of_silence_sound_path": self.minute_of_silence_sound_path,
+            "ALERTS_TOKEN": self.ALERTS_TOKEN,
+            "ALERT_UID": self.ALERT_UID,
+            "ALERT_UIDS": self.ALERT_UIDS,
+            "minute_of_silence_enabled": self.minute_of_silence_enabled,
+            "candle_gif_path": self.candle_gif_path,
+            "silent_mode": self.silent_mode,
+            "test_mode_on": self.test_mode_on,
+            "test_offset_seconds": int(self._time_offset.total_seconds()),
+            "entry_lock_enabled": self.entry_lock_enabled,
+            "entry_password": self.entry_password,
+            "shutdown_enabled": self.shutdown_enabled,
+            "shutdown_time": self.shutdown_time,
+            "hibernation_enabled": self.hibernation_enabled,
+            "hibernation_time": self.hibernation_time,
+            "autostart_enabled": self.autostart_enabled,
+            "recording_max_seconds": self.recording_max_seconds,
+            "bell_grace_seconds": self.bell_grace_seconds,
+            "slideshow_enabled": self.slideshow_enabled,
+            "slideshow_dir": self.slideshow_dir,
+            "slideshow_interval_seconds": self.slideshow_interval_seconds,
+            "slideshow_prefetch": self.slideshow_prefetch,
+            "schedule": self.schedule,
+            "schedule_profiles": self.schedule_profiles,
+            "schedule_weekdays": self.schedule_weekdays,
+            "schedule_overrides": self.schedule_overrides,
+            "schedule_holidays": self.schedule_holidays,
+            "custom_recordings": self._recordings_config(),
+        }
+
+    def _recordings_config(self) -> dict:
+        """custom_recordings для конфігу з used_in_schedule зі зворотного індексу"""
+        data = {}
+        for name, rec in self.custom_recordings.items():
+            used = []
+            for profile, i, when in self._recording_usage.get(name, ()):
+                rows = self.schedule if profile == MAIN_PROFILE else self.schedule_profiles.get(profile, [])
+                slot = {"profile": profile, "n": rows[i].get("n"), "when": when}
+                if rows[i].get("shift", 1) > 1:
+                    slot["shift"] = rows[i]["shift"]
+                used.append(slot)
+            data[name] = dict(rec, used_in_schedule=used)
+        return data
+
+    def _retarget_recording(self, old: str, new: str):
+        """Переводить усі прив'язки old у розкладах на new ("" — зняти прив'язку)"""
+        slots = self._recording_usage.get(old)
+        if not slots:
+            return
+        for profile, i, when in slots:
+            rows = self.schedule if profile == MAIN_PROFILE else self.schedule_profiles.get(profile, [])
+            if i < len(rows):
+                if new:
+                    rows[i]["recording_" + when] = new
+                else:
+                    rows[i].pop("recording_" + when, None)
+        self._rebuild_calendar()
+
+    def _rename_recording(self, old_name: str, new_name: str) -> bool:
+        """Перейменовує запис разом з усіма його прив'язками в розкладах"""
+        if old_name not in self.custom_recordings or new_name in self.custom_recordings:
+            return False
+        self.custom_recordings[new_name] = self.custom_recordings.pop(old_name)
+        self._library.rename(old_name, new_name)
+        self._library.save()
+        self._retarget_recording(old_name, new_name)
+        self._save_config()
+        return True
+
+    def _delete_recording(self, name: str) -> bool:
+        """Видаляє запис і файл; дзвінки, що його використовували, повертаються до типового звуку"""
+        rec = self.custom_recordings.get(name)
+        if rec is None:
+            return False
+        filepath = rec.get("path", "")
+        if filepath and os.path.exists(filepath):
+            os.remove(filepath)
+        self._sound_bank.discard(filepath)
+        del self.custom_recordings[name]
+        self._library.remove(name)
+        self._library.save()
+        self._retarget_recording(name, "")
+        self._save_config()
+        return True
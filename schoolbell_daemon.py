@@ -0,0 +1,83 @@
+"""
+Шкільний дзвінок без вікна: лише розклад, звук, тривоги і вимкнення ПК.
+
+Запуск: python schoolbell_daemon.py [--base-dir ПАПКА] [--timing-json ФАЙЛ]
+Конфіг (config.json) той самий, що й у вікна; зміни підхоплюються на льоту.
+"""
+
+import time
+
+STARTUP_T0 = time.perf_counter()
+
+import signal
+import argparse
+import threading
+from pathlib import Path
+
+from schoolbell_core import CONFIG_WATCH_MS, STARTUP_LOG_NAME, app_dir, alert_active, StartupTimer, BellCore
+
+
+class BellDaemon(BellCore):
+    """Ядро дзвінків із власним циклом замість Tk-циклу"""
+
+    TICK = 0.5
+
+    def __init__(self, base_dir: Path, timing_json: str = None):
+        self._init_core(base_dir, StartupTimer(STARTUP_T0))
+        self.timing_json = timing_json
+        self._stop = threading.Event()
+        self._load_config()
+        self._startup.mark("config")
+
+    def run(self):
+        self._start_core()
+        next_check = time.monotonic() + CONFIG_WATCH_MS / 1000
+        report_saved = False
+        try:
+            while not self._stop.wait(self.TICK):
+                if not report_saved and self._startup.has("audio"):
+                    report_saved = True
+                    self._startup.save(self.base_dir / STARTUP_LOG_NAME)
+                    print(self._startup.report(), flush=True)
+
+                regions = self._drain_alert_results()
+                if regions is not None:
+                    active = alert_active(regions)
+                    if active and not self._alarm_priority:
+                        self._alarm_on()
+                    elif not active and self._alarm_priority:
+                        self._alarm_off()
+
+                self._minute_of_silence_tick(self._now_dt())
+
+                if time.monotonic() >= next_check:
+                    next_check = time.monotonic() + CONFIG_WATCH_MS / 1000
+                    self._check_config()
+        finally:
+            self._stop_core()
+            self._config_store.flush()
+            if self.timing_json:
+                try:
+                    self._bell_timing.export(self.timing_json)
+                except Exception:
+                    pass
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Шкільний дзвінок без GUI")
+    parser.add_argument("--base-dir", default=None, help="папка з config.json (типово — поруч зі скриптом)")
+    parser.add_argument("--timing-json", default=None, help="при завершенні зберегти виміри точності дзвінків у цей файл")
+    args = parser.parse_args()
+
+    daemon = BellDaemon(Path(args.base_dir).resolve() if args.base_dir else app_dir(), args.timing_json)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: daemon.stop())
+    print(f"Дзвінок працює, конфіг: {daemon.config_path}", flush=True)
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()